@@ -10,10 +10,27 @@ Specialized agents for different tasks:
 - Debugger: Error analysis and fixing
 """
 
-from aol_fire.agents.orchestrator import OrchestratorAgent
-from aol_fire.agents.planner import PlannerAgent
-from aol_fire.agents.coder import CoderAgent
-from aol_fire.agents.prompts import AGENT_PROMPTS
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from aol_fire.agents.orchestrator import OrchestratorAgent
+    from aol_fire.agents.planner import PlannerAgent
+    from aol_fire.agents.coder import CoderAgent
+    from aol_fire.agents.prompts import AGENT_PROMPTS
+
+
+# Agents are imported on first access, so helper modules such as
+# aol_fire.agents.parsing can be used by aol_fire.llm (which the agents
+# import) without a circular import
+_LAZY_IMPORTS = {
+    "OrchestratorAgent": "aol_fire.agents.orchestrator",
+    "PlannerAgent": "aol_fire.agents.planner",
+    "CoderAgent": "aol_fire.agents.coder",
+    "AGENT_PROMPTS": "aol_fire.agents.prompts",
+}
 
 __all__ = [
     "OrchestratorAgent",
@@ -21,3 +38,15 @@ __all__ = [
     "CoderAgent",
     "AGENT_PROMPTS",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
@@ -4,13 +4,94 @@ Coder Agent - Expert code generation and modification.
 
 from __future__ import annotations
 
+import hashlib
+import io
 import json
-from typing import Any, Dict, List, Optional
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    ToolMessage,
+    message_chunk_to_message,
+)
 
 from aol_fire.models import Task, TaskStatus, ToolCall, FileChange
 from aol_fire.core import FireConfig
-from aol_fire.llm import create_chat_model
+from aol_fire.llm import (
+    CACHE_CONTROL,
+    JSON_RESPONSE_FORMAT,
+    create_chat_model,
+    create_prompt_prefix,
+    supports_prompt_caching,
+    tool_args_schema,
+    uses_cache_control,
+)
 from aol_fire.agents.prompts import CODER_PROMPT
+from aol_fire.agents.parsing import (
+    dumps_json,
+    extract_first_json,
+    loads_json,
+    parse_json_response,
+)
+
+
+# Tools without side effects that can safely run concurrently within one turn
+PARALLEL_SAFE_TOOLS = frozenset({
+    "read_file",
+    "list_directory",
+    "search_files",
+    "analyze_code",
+    "analyze_project",
+    "git_status",
+    "git_diff",
+    "web_search",
+    "fetch_url",
+})
+
+MAX_TOOL_WORKERS = 8
+
+# Token budget for file contents included in a task prompt, per file
+FILE_CONTEXT_TOKENS = 500
+
+# Rough chars-per-token ratio used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+# Without provider-side caching, older tool results above this size are
+# cut down to a stub so they aren't re-sent in full on every iteration
+TOOL_RESULT_COMPACT_CHARS = 4000
+TOOL_RESULT_STUB_CHARS = 500
+
+# Length of tool results kept on ToolCall records
+TOOL_CALL_RECORD_CHARS = 1000
+
+# First fenced code block: optional language tag, then the body
+_CODE_FENCE_RE = re.compile(r"```([A-Za-z0-9_+-]*)[^\S\n]*\n(.*?)```", re.DOTALL)
+
+# Deleting these from UTF-8 leaves one byte per character
+_UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+def _clip(obj: Any, limit: int) -> str:
+    """Render obj as text, never materializing more than needed for limit chars."""
+    if isinstance(obj, str):
+        text = obj
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        head = limit * 4
+        text = bytes(obj[:head]).decode("utf-8", "replace")
+        # Characters past the decoded head, counted without decoding them
+        rest = len(bytes(obj[head:]).translate(None, _UTF8_CONTINUATION_BYTES))
+        if len(text) <= limit and not rest:
+            return text
+        return f"{text[:limit]}\n[truncated {max(0, len(text) - limit) + rest:,} chars]"
+    else:
+        text = str(obj)
+    
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}\n[truncated {len(text) - limit:,} chars]"
 
 
 class CoderAgent:
@@ -28,57 +109,251 @@ class CoderAgent:
     def __init__(self, config: FireConfig, tools: List[Any] = None):
         self.config = config
         self.llm = create_chat_model(config, "coder")
-        self.llm.system_prompt = CODER_PROMPT
+        self._prefix_messages = create_prompt_prefix(config, self.llm.model_name, CODER_PROMPT)
+        self._cache_control = uses_cache_control(config, self.llm.model_name)
+        self._prompt_caching = supports_prompt_caching(config, self.llm.model_name)
+        self._json_mode = config.llm_json_mode
+        self._json_kwargs = {"response_format": JSON_RESPONSE_FORMAT} if self._json_mode else {}
         self.tools = tools or []
         self.tool_map = {t.name: t for t in self.tools}
+        self._tool_names_csv = ", ".join(self.tool_map)
+        self._tool_defs = self._build_tool_definitions()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._encoding: Any = None
+        self._encoding_loaded = False
+        # (hash, rendered) of the last files context, swapped in one
+        # assignment since prefetch threads read it too
+        self._files_memo: Tuple[Optional[str], str] = (None, "")
     
-    def execute_task(
-        self, 
-        task: Task, 
-        context: Optional[Dict] = None
-    ) -> Dict[str, Any]:
+    def _get_encoding(self) -> Any:
+        """Get the tiktoken encoding for the coder model, or None if unavailable."""
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            try:
+                import tiktoken
+                
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.llm.model_name)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # Missing package, or the BPE file could not be downloaded
+                # (offline, proxy); fall back to the chars-per-token estimate
+                self._encoding = None
+        return self._encoding
+    
+    def _truncate_tokens(self, text: str, max_tokens: int) -> Tuple[str, int]:
+        """Truncate text to at most max_tokens, returning (text, tokens_used)."""
+        if max_tokens <= 0:
+            return "", 0
+        
+        # Never encode more than could possibly fit in the budget
+        head = text[:max_tokens * CHARS_PER_TOKEN * 4]
+        
+        enc = self._get_encoding()
+        if enc is None:
+            head = head[:max_tokens * CHARS_PER_TOKEN]
+            return head, -(-len(head) // CHARS_PER_TOKEN)
+        
+        tokens = enc.encode(head, disallowed_special=())[:max_tokens]
+        return enc.decode(tokens), len(tokens)
+    
+    def _build_files_context(self, files: Dict[str, str]) -> str:
         """
-        Execute a coding task.
+        Render file contents for a prompt within a shared token budget.
         
-        Args:
-            task: The task to execute
-            context: Additional context (file contents, etc.)
+        Files are emitted in path order; tokens left unused by short files
+        are passed on to the files after them.
+        """
+        buf = io.StringIO()
+        remaining = FILE_CONTEXT_TOKENS * len(files)
         
-        Returns:
-            Dictionary with results, tool calls, and file changes
+        for i, (path, content) in enumerate(sorted(files.items())):
+            per_file = remaining // (len(files) - i)
+            chunk, used = self._truncate_tokens(content, per_file)
+            remaining -= used
+            
+            if i:
+                buf.write("\n\n")
+            buf.write(f"=== {path} ===\n")
+            buf.write(chunk)
+        
+        return buf.getvalue()
+    
+    def _files_context(self, files: Dict[str, str]) -> str:
+        """Get the rendered files context, reusing the last one if files are unchanged."""
+        h = hashlib.blake2b(digest_size=8)
+        for path, content in sorted(files.items()):
+            h.update(path.encode())
+            h.update(b"\0")
+            h.update(content.encode())
+            h.update(b"\0")
+        files_hash = h.hexdigest()
+        
+        memo_hash, rendered = self._files_memo
+        if files_hash != memo_hash:
+            rendered = self._build_files_context(files)
+            self._files_memo = (files_hash, rendered)
+        return rendered
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the thread pool used for parallel tool calls."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=MAX_TOOL_WORKERS,
+                thread_name_prefix="fire-tool",
+            )
+        return self._executor
+    
+    def _run_tool_call(self, tc: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        """Invoke a single tool call, returning (result, error)."""
+        tool_name = tc.get("name", "")
+        if tool_name not in self.tool_map:
+            return f"Unknown tool: {tool_name}", None
+        
+        try:
+            return self.tool_map[tool_name].invoke(tc.get("args", {})), None
+        except Exception as e:
+            return f"Error: {str(e)}", str(e)
+    
+    def _run_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Tuple[Any, Optional[str]]]:
         """
-        from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+        Run a turn's tool calls, in parallel when they are all side-effect free.
         
-        # Build context string
+        Results are returned in the original order so that ToolMessages line
+        up with their tool_call_ids.
+        """
+        parallel = len(tool_calls) > 1 and all(
+            tc.get("name") in PARALLEL_SAFE_TOOLS for tc in tool_calls
+        )
+        if not parallel:
+            return [self._run_tool_call(tc) for tc in tool_calls]
+        return list(self._get_executor().map(self._run_tool_call, tool_calls))
+    
+    @staticmethod
+    def _project_info_json(context: Dict) -> Optional[str]:
+        """Serialized project info, reusing context["project_info_json"] when provided."""
+        if context.get("project_info_json"):
+            return context["project_info_json"]
+        if "project_info" in context:
+            return dumps_json(context["project_info"], indent=True)
+        return None
+    
+    def build_task_prompt(self, task: Task, context: Optional[Dict] = None) -> str:
+        """
+        Build the initial prompt for a coding task.
+        
+        Kept separate from execute_task so the prompt for the next task
+        can be prepared while the current one is still running.
+        """
+        # Stable parts first, task-specific details last, so consecutive
+        # requests share as long a cacheable prefix as possible
         context_str = ""
         if context:
-            if "files" in context:
-                files_content = "\n\n".join(
-                    f"=== {path} ===\n{content[:2000]}"
-                    for path, content in context["files"].items()
-                )
-                context_str += f"\n\nRelevant Files:\n{files_content}"
+            project_info = self._project_info_json(context)
+            if project_info:
+                context_str += f"Project Info:\n{project_info}\n\n"
             
-            if "project_info" in context:
-                context_str += f"\n\nProject Info:\n{json.dumps(context['project_info'], indent=2)}"
+            if "files" in context:
+                files_content = self._files_context(context["files"])
+                context_str += f"Relevant Files:\n{files_content}\n\n"
         
-        prompt = f"""Execute this coding task:
-
-Task: {task.title}
-Description: {task.description}
-{context_str}
+        return f"""Available tools: {self._tool_names_csv}
 
-Use the available tools to:
+{context_str}Use the available tools to:
 1. Read any files you need to understand
 2. Write or modify code as needed
 3. Verify your changes work
 
-Available tools: {', '.join(self.tool_map.keys())}"""
+Execute this coding task:
+
+Task: {task.title}
+Description: {task.description}"""
+    
+    def _stream_response(
+        self,
+        messages: List[Any],
+        tool_defs: List[Dict],
+    ) -> Tuple[Any, Dict[str, Future]]:
+        """
+        Stream one LLM response, dispatching tool calls as soon as they're complete.
+        
+        A tool call is submitted to the thread pool once its arguments parse
+        as JSON, as long as it and every call before it in the turn are in
+        PARALLEL_SAFE_TOOLS; the first side-effecting call stops early
+        dispatch so effects keep their order.
+        
+        Returns:
+            The complete AIMessage and the early futures keyed by tool call id
+        """
+        merged = None
+        early: Dict[str, Future] = {}
+        dispatching = True
+        
+        for chunk in self.llm.stream(messages, tools=tool_defs if tool_defs else None):
+            merged = chunk if merged is None else merged + chunk
+            
+            if not dispatching or not chunk.tool_call_chunks:
+                continue
+            
+            for tc in merged.tool_call_chunks:
+                if tc.get("name") not in PARALLEL_SAFE_TOOLS:
+                    dispatching = False
+                    break
+                tool_id = tc.get("id")
+                if not tool_id or tool_id in early:
+                    continue
+                try:
+                    args = loads_json(tc.get("args") or "")
+                except json.JSONDecodeError:
+                    continue
+                early[tool_id] = self._get_executor().submit(
+                    self._run_tool_call, {"name": tc["name"], "args": args}
+                )
+        
+        if merged is None:
+            return AIMessage(content=""), early
+        
+        return message_chunk_to_message(merged), early
+    
+    def _collect_tool_results(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        early: Dict[str, Future],
+    ) -> List[Tuple[Any, Optional[str]]]:
+        """Combine early-dispatched results with the remaining calls, in call order."""
+        remaining = [tc for tc in tool_calls if tc.get("id") not in early]
+        remaining_results = iter(self._run_tool_calls(remaining))
         
-        messages = [HumanMessage(content=prompt)]
+        return [
+            early[tc["id"]].result() if tc.get("id") in early else next(remaining_results)
+            for tc in tool_calls
+        ]
+    
+    def execute_task(
+        self, 
+        task: Task, 
+        context: Optional[Dict] = None,
+        prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute a coding task.
         
-        # Build tool definitions for LLM
-        tool_defs = self._get_tool_definitions()
+        Args:
+            task: The task to execute
+            context: Additional context (file contents, etc.)
+            prompt: Prebuilt prompt from build_task_prompt, if available
+        
+        Returns:
+            Dictionary with results, tool calls, and file changes
+        """
+        if prompt is None:
+            prompt = self.build_task_prompt(task, context)
+        
+        messages = self._prefix_messages + [HumanMessage(content=prompt)]
+        
+        # Tool definitions for LLM (built once in __init__)
+        tool_defs = self._tool_defs
         
         # Execute with tool calling loop
         result = {
@@ -91,32 +366,47 @@ Available tools: {', '.join(self.tool_map.keys())}"""
         
         max_iterations = 15
         iteration = 0
+        cache_boundary: Optional[int] = None
         
         while iteration < max_iterations:
             iteration += 1
             
-            # Get LLM response
-            response = self.llm.invoke(messages, tools=tool_defs if tool_defs else None)
+            # Only the delta since the last request should miss the cache:
+            # move the breakpoint to the end of the history, or compact stale
+            # tool output when the provider can't cache it
+            if self._cache_control:
+                cache_boundary = self._move_cache_boundary(messages, cache_boundary)
+            elif not self._prompt_caching:
+                self._compact_tool_results(messages)
+            
+            # Get LLM response, starting read-only tools while it streams
+            # (the model retries a failed stream until its first chunk)
+            response, early = self._stream_response(messages, tool_defs)
             
             # Check for tool calls
             if hasattr(response, 'tool_calls') and response.tool_calls:
                 messages.append(response)
                 
-                for tc in response.tool_calls:
+                outcomes = self._collect_tool_results(response.tool_calls, early)
+                
+                for tc, (tool_result, error) in zip(response.tool_calls, outcomes):
                     tool_name = tc.get("name", "")
                     tool_args = tc.get("args", {})
                     tool_id = tc.get("id", f"call_{iteration}")
                     
-                    # Execute tool
                     if tool_name in self.tool_map:
-                        try:
-                            tool_result = self.tool_map[tool_name].invoke(tool_args)
-                            
+                        if error is not None:
+                            result["tool_calls"].append(ToolCall(
+                                tool_name=tool_name,
+                                arguments=tool_args,
+                                error=_clip(error, TOOL_CALL_RECORD_CHARS),
+                            ))
+                        else:
                             # Track tool call
                             result["tool_calls"].append(ToolCall(
                                 tool_name=tool_name,
                                 arguments=tool_args,
-                                result=str(tool_result)[:1000],
+                                result=_clip(tool_result, TOOL_CALL_RECORD_CHARS),
                             ))
                             
                             # Track file changes
@@ -130,19 +420,9 @@ Available tools: {', '.join(self.tool_map.keys())}"""
                                     path=tool_args.get("path", "unknown"),
                                     action="modified",
                                 ))
-                            
-                        except Exception as e:
-                            tool_result = f"Error: {str(e)}"
-                            result["tool_calls"].append(ToolCall(
-                                tool_name=tool_name,
-                                arguments=tool_args,
-                                error=str(e),
-                            ))
-                    else:
-                        tool_result = f"Unknown tool: {tool_name}"
                     
                     messages.append(ToolMessage(
-                        content=str(tool_result),
+                        content=_clip(tool_result, self.config.max_tool_output_chars),
                         tool_call_id=tool_id
                     ))
             else:
@@ -156,21 +436,111 @@ Available tools: {', '.join(self.tool_map.keys())}"""
         
         return result
     
-    def _get_tool_definitions(self) -> List[Dict]:
+    def batch_execute_tasks(
+        self,
+        tasks: List[Task],
+        context: Optional[Dict] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute several simple, tool-free tasks with a single LLM call.
+        
+        Falls back to execute_task for every task if the batched response
+        cannot be parsed.
+        
+        Args:
+            tasks: Tasks that need no file or tool access
+            context: Additional context (file contents, etc.)
+        
+        Returns:
+            One result dictionary per task, in the same order as tasks
+        """
+        task_list = "\n".join(
+            f"{i}. [{t.id}] {t.title}: {t.description}"
+            for i, t in enumerate(tasks, start=1)
+        )
+        
+        context_str = ""
+        project_info = self._project_info_json(context) if context else None
+        if project_info:
+            context_str = f"\n\nProject Info:\n{project_info}"
+        
+        prompt = f"""Complete each of these small tasks:
+
+{task_list}
+{context_str}
+
+Respond with ONLY a JSON array, one entry per task:
+[
+    {{"task_id": "<id in brackets>", "output": "Result of the task"}}
+]"""
+        
+        response = self.llm.invoke(self._prefix_messages + [HumanMessage(content=prompt)])
+        
+        outputs: Dict[str, str] = {}
+        try:
+            data = extract_first_json(response.content, "[")
+            if data:
+                for item in loads_json(data):
+                    outputs[str(item["task_id"])] = str(item.get("output", ""))
+        except (json.JSONDecodeError, KeyError, TypeError):
+            outputs = {}
+        
+        if not all(t.id in outputs for t in tasks):
+            return [self.execute_task(t, context) for t in tasks]
+        
+        return [
+            {
+                "success": True,
+                "output": outputs[t.id],
+                "tool_calls": [],
+                "file_changes": [],
+                "error": None,
+            }
+            for t in tasks
+        ]
+    
+    def _move_cache_boundary(self, messages: List[Any], boundary: Optional[int]) -> int:
+        """Mark the last message as the cache breakpoint, clearing the previous one."""
+        if boundary is not None:
+            messages[boundary].additional_kwargs.pop("cache_control", None)
+        boundary = len(messages) - 1
+        messages[boundary].additional_kwargs["cache_control"] = CACHE_CONTROL
+        return boundary
+    
+    def _compact_tool_results(self, messages: List[Any]) -> None:
+        """Replace large tool results from earlier turns with a short stub."""
+        # Results after the most recent tool-calling turn are still fresh
+        last_turn = max(
+            (i for i, m in enumerate(messages) if isinstance(m, AIMessage) and m.tool_calls),
+            default=-1,
+        )
+        
+        for i in range(last_turn):
+            msg = messages[i]
+            if isinstance(msg, ToolMessage) and len(msg.content) > TOOL_RESULT_COMPACT_CHARS:
+                messages[i] = ToolMessage(
+                    content=f"{msg.content[:TOOL_RESULT_STUB_CHARS]}\n[truncated earlier tool result]",
+                    tool_call_id=msg.tool_call_id,
+                )
+    
+    def add_tool(self, tool: Any) -> None:
+        """Register an extra tool and rebuild the cached tool definitions."""
+        self.tools.append(tool)
+        self.tool_map[tool.name] = tool
+        self._tool_names_csv = ", ".join(self.tool_map)
+        self._tool_defs = self._build_tool_definitions()
+    
+    def _build_tool_definitions(self) -> List[Dict]:
         """Convert tools to OpenAI function format."""
         defs = []
         for tool in self.tools:
             if hasattr(tool, 'name') and hasattr(tool, 'description'):
-                schema = {}
-                if hasattr(tool, 'args_schema'):
-                    schema = tool.args_schema.model_json_schema()
-                
                 defs.append({
                     "type": "function",
                     "function": {
                         "name": tool.name,
                         "description": tool.description,
-                        "parameters": schema,
+                        "parameters": tool_args_schema(tool),
                     }
                 })
         return defs
@@ -192,8 +562,6 @@ Available tools: {', '.join(self.tool_map.keys())}"""
         Returns:
             Generated code as a string
         """
-        from langchain_core.messages import HumanMessage
-        
         prompt = f"""Generate {language} code for the following specification:
 
 {spec}
@@ -208,19 +576,15 @@ Requirements:
 
 Respond with ONLY the code, no explanations."""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke(self._prefix_messages + [HumanMessage(content=prompt)])
         
         # Extract code from response
         code = response.content
         
         # Try to extract from code block if present
-        if "```" in code:
-            parts = code.split("```")
-            for part in parts[1::2]:  # Every other part (inside code blocks)
-                lines = part.split("\n")
-                if lines[0].strip().lower() in [language, language.lower(), ""]:
-                    return "\n".join(lines[1:]).strip()
-                return part.strip()
+        match = _CODE_FENCE_RE.search(code)
+        if match:
+            return match.group(2).strip()
         
         return code.strip()
     
@@ -235,8 +599,6 @@ Respond with ONLY the code, no explanations."""
         Returns:
             Dictionary with issues and suggestions
         """
-        from langchain_core.messages import HumanMessage
-        
         prompt = f"""Review this code for issues and improvements:
 
 {f'File: {filepath}' if filepath else ''}
@@ -256,13 +618,14 @@ Provide a JSON review:
     "summary": "Brief overall assessment"
 }}"""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke(
+            self._prefix_messages + [HumanMessage(content=prompt)], **self._json_kwargs
+        )
         
         try:
-            start = response.content.find('{')
-            end = response.content.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(response.content[start:end])
+            review = parse_json_response(response.content, self._json_mode)
+            if review:
+                return review
         except:
             pass
         
@@ -291,8 +654,6 @@ Provide a JSON review:
         Returns:
             Dictionary with fix and explanation
         """
-        from langchain_core.messages import HumanMessage
-        
         prompt = f"""Fix this error in the code:
 
 {f'File: {filepath}' if filepath else ''}
@@ -310,16 +671,13 @@ Respond with:
 2. The fixed code
 3. How to prevent similar errors"""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke(self._prefix_messages + [HumanMessage(content=prompt)])
         
         # Extract fixed code
         fixed_code = None
-        if "```" in response.content:
-            parts = response.content.split("```")
-            for part in parts[1::2]:
-                lines = part.split("\n")
-                fixed_code = "\n".join(lines[1:] if lines[0].strip() else lines).strip()
-                break
+        match = _CODE_FENCE_RE.search(response.content)
+        if match:
+            fixed_code = match.group(2).strip()
         
         return {
             "explanation": response.content,
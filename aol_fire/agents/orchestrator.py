@@ -4,12 +4,46 @@ Orchestrator Agent - Coordinates the multi-agent system.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import copy
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage
 
 from aol_fire.models import AgentRole, AgentState, Plan, Task, TaskStatus
 from aol_fire.core import FireConfig
-from aol_fire.llm import create_chat_model
+from aol_fire.llm import JSON_RESPONSE_FORMAT, create_chat_model
 from aol_fire.agents.prompts import ORCHESTRATOR_PROMPT
+from aol_fire.agents.parsing import dumps_json, parse_json_response
+from aol_fire.agents.planner import PlannerAgent
+from aol_fire.agents.coder import CoderAgent
+
+
+# Tags marking tasks that need no tools and can share a single LLM call
+BATCHABLE_TAGS = frozenset({"simple", "trivial"})
+MAX_BATCH_SIZE = 5
+
+# Number of goal analyses remembered per orchestrator
+ANALYSIS_CACHE_SIZE = 256
+
+# Task tag -> (precedence, role); when several tags match, the lowest
+# precedence wins, e.g. a "fix" + "code" task goes to the debugger
+_TAG_ROLE_MAP: Dict[str, Tuple[int, AgentRole]] = {
+    "research": (0, AgentRole.RESEARCHER),
+    "search": (0, AgentRole.RESEARCHER),
+    "review": (1, AgentRole.REVIEWER),
+    "qa": (1, AgentRole.REVIEWER),
+    "debug": (2, AgentRole.DEBUGGER),
+    "fix": (2, AgentRole.DEBUGGER),
+    "error": (2, AgentRole.DEBUGGER),
+    "deploy": (3, AgentRole.DEVOPS),
+    "devops": (3, AgentRole.DEVOPS),
+    "code": (4, AgentRole.CODER),
+    "implement": (4, AgentRole.CODER),
+    "create": (4, AgentRole.CODER),
+}
 
 
 class OrchestratorAgent:
@@ -23,10 +57,24 @@ class OrchestratorAgent:
     - Result aggregation
     """
     
-    def __init__(self, config: FireConfig):
+    def __init__(self, config: FireConfig, tools: List[Any] = None):
         self.config = config
         self.llm = create_chat_model(config, "orchestrator")
         self.llm.system_prompt = ORCHESTRATOR_PROMPT
+        self._json_mode = config.llm_json_mode
+        self._json_kwargs = {"response_format": JSON_RESPONSE_FORMAT} if self._json_mode else {}
+        self.tools = tools or []
+        
+        # Sub-agents, created on first use and reused afterwards
+        self._planner: Optional[PlannerAgent] = None
+        self._agents: Dict[AgentRole, Any] = {}
+        
+        # Goal analyses keyed by a hash of (goal, context)
+        self._analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        # Speculative preparation of the next task's prompt
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+        self._next_task_prep: Optional[Tuple[Tuple[str, str, str], Future]] = None
     
     def analyze_goal(self, goal: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -36,14 +84,23 @@ class OrchestratorAgent:
         - complexity: simple, moderate, complex
         - agents_needed: list of agent roles
         - approach: description of how to tackle it
+        
+        Results are memoized per (goal, context), so rerunning the same goal
+        doesn't cost another LLM call.
         """
-        from langchain_core.messages import HumanMessage
+        context_json = dumps_json(context) if context else ""
+        key = hashlib.blake2b(f"{goal}\0{context_json}".encode(), digest_size=16).hexdigest()
+        
+        cached = self._analysis_cache.get(key)
+        if cached is not None:
+            self._analysis_cache.move_to_end(key)
+            return copy.deepcopy(cached)
         
         prompt = f"""Analyze this goal and determine the best approach:
 
 Goal: {goal}
 
-Context: {context or 'No additional context'}
+Context: {context_json or 'No additional context'}
 
 Respond with a JSON analysis:
 {{
@@ -54,17 +111,16 @@ Respond with a JSON analysis:
     "key_challenges": ["potential", "challenges"]
 }}"""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke([HumanMessage(content=prompt)], **self._json_kwargs)
         
         # Parse response
-        import json
         try:
-            # Extract JSON from response
-            content = response.content
-            start = content.find('{')
-            end = content.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(content[start:end])
+            analysis = parse_json_response(response.content, self._json_mode)
+            if isinstance(analysis, dict) and analysis:
+                self._analysis_cache[key] = analysis
+                if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
+                return copy.deepcopy(analysis)
         except:
             pass
         
@@ -77,46 +133,147 @@ Respond with a JSON analysis:
             "key_challenges": [],
         }
     
+    def clear_cache(self) -> None:
+        """Forget memoized goal analyses."""
+        self._analysis_cache.clear()
+    
+    def get_planner(self) -> PlannerAgent:
+        """Get the shared Planner Agent."""
+        if self._planner is None:
+            self._planner = PlannerAgent(self.config)
+        return self._planner
+    
+    def get_agent(self, role: AgentRole) -> Any:
+        """
+        Get the shared agent that executes tasks for a role.
+        
+        Only the Coder Agent is implemented, so every execution role is
+        currently served by a single CoderAgent instance.
+        """
+        if role == AgentRole.PLANNER:
+            return self.get_planner()
+        
+        if AgentRole.CODER not in self._agents:
+            self._agents[AgentRole.CODER] = CoderAgent(self.config, self.tools)
+        return self._agents.setdefault(role, self._agents[AgentRole.CODER])
+    
     def delegate_planning(self, goal: str, context: Dict) -> Plan:
         """Delegate planning to the Planner Agent."""
-        from aol_fire.agents.planner import PlannerAgent
-        
-        planner = PlannerAgent(self.config)
-        return planner.create_plan(goal, context)
+        return self.get_planner().create_plan(goal, context)
     
     def select_agent_for_task(self, task: Task) -> AgentRole:
         """Select the best agent for a given task."""
         # Simple heuristic based on task tags
-        tags = set(task.tags)
-        
-        if "research" in tags or "search" in tags:
-            return AgentRole.RESEARCHER
-        if "review" in tags or "qa" in tags:
-            return AgentRole.REVIEWER
-        if "debug" in tags or "fix" in tags or "error" in tags:
-            return AgentRole.DEBUGGER
-        if "deploy" in tags or "devops" in tags:
-            return AgentRole.DEVOPS
-        if "code" in tags or "implement" in tags or "create" in tags:
-            return AgentRole.CODER
+        matches = [_TAG_ROLE_MAP[tag] for tag in task.tags if tag in _TAG_ROLE_MAP]
+        if matches:
+            return min(matches)[1]
         
         # Default to coder for most tasks
         return AgentRole.CODER
     
+    def is_batchable(self, task: Task) -> bool:
+        """Check if a task is simple enough to be batched with others."""
+        return (
+            bool(BATCHABLE_TAGS.intersection(task.tags))
+            and self.select_agent_for_task(task) == AgentRole.CODER
+        )
+    
+    def next_task_batch(self, plan: Plan) -> List[Task]:
+        """
+        Get the next tasks to execute.
+        
+        Consecutive batchable tasks that don't depend on each other are
+        grouped (up to MAX_BATCH_SIZE); otherwise only the current task
+        is returned.
+        """
+        batch: List[Task] = []
+        batch_ids = set()
+        
+        for task in plan.pending_tasks:
+            if not self.is_batchable(task) or batch_ids.intersection(task.dependencies):
+                break
+            batch.append(task)
+            batch_ids.add(task.id)
+            if len(batch) >= MAX_BATCH_SIZE:
+                break
+        
+        if batch:
+            return batch
+        
+        current = plan.current_task
+        return [current] if current else []
+    
+    def prefetch_task_prompt(
+        self,
+        coder: CoderAgent,
+        task: Task,
+        context: Optional[Dict] = None,
+    ) -> None:
+        """
+        Start building the prompt for an upcoming task in the background.
+        
+        Call this while the current task is still executing so the next
+        task's prompt is ready as soon as the coder is free.
+        """
+        self.invalidate_prefetch()
+        
+        if self._prefetch_pool is None:
+            self._prefetch_pool = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="fire-prefetch",
+            )
+        
+        key = (task.id, task.title, task.description)
+        future = self._prefetch_pool.submit(coder.build_task_prompt, task, context)
+        self._next_task_prep = (key, future)
+    
+    def take_prefetched_prompt(self, task: Task) -> Optional[str]:
+        """
+        Return the prefetched prompt for a task, if one is ready.
+        
+        Returns None when nothing was prefetched or the plan drifted
+        (the task was replaced, renamed or re-described) since prefetching.
+        """
+        if self._next_task_prep is None:
+            return None
+        
+        key, future = self._next_task_prep
+        self._next_task_prep = None
+        
+        if key != (task.id, task.title, task.description):
+            future.cancel()
+            return None
+        
+        try:
+            return future.result()
+        except Exception:
+            return None
+    
+    def invalidate_prefetch(self) -> None:
+        """Drop any pending prefetch, e.g. after the plan is refined."""
+        if self._next_task_prep is not None:
+            self._next_task_prep[1].cancel()
+            self._next_task_prep = None
+    
     def summarize_progress(self, state: AgentState) -> str:
         """Generate a progress summary."""
         if not state.plan:
             return "No plan created yet."
         
         plan = state.plan
+        total = len(plan.tasks)
+        completed = plan.completed_count
+        failed = plan.failed_count
+        progress = completed / total * 100 if total else 0.0
+        
         summary_parts = [
             f"Goal: {plan.goal}",
-            f"Progress: {plan.progress:.1f}%",
-            f"Tasks: {len(plan.completed_tasks)}/{len(plan.tasks)} completed",
+            f"Progress: {progress:.1f}%",
+            f"Tasks: {completed}/{total} completed",
         ]
         
-        if plan.failed_tasks:
-            summary_parts.append(f"Failed: {len(plan.failed_tasks)} tasks")
+        if failed:
+            summary_parts.append(f"Failed: {failed} tasks")
         
         # Current task
         current = plan.current_task
@@ -125,16 +282,16 @@ Respond with a JSON analysis:
         
         # Files changed
         if state.file_changes:
-            created = len([f for f in state.file_changes if f.action == "created"])
-            modified = len([f for f in state.file_changes if f.action == "modified"])
+            created = modified = 0
+            for f in state.file_changes:
+                created += f.action == "created"
+                modified += f.action == "modified"
             summary_parts.append(f"Files: {created} created, {modified} modified")
         
         return "\n".join(summary_parts)
     
     def handle_error(self, error: str, task: Task, state: AgentState) -> str:
         """Handle an error during task execution."""
-        from langchain_core.messages import HumanMessage
-        
         prompt = f"""An error occurred during task execution. Analyze and suggest recovery:
 
 Task: {task.title}
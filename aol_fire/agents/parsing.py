@@ -0,0 +1,127 @@
+"""
+Helpers for pulling structured data out of LLM responses.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def extract_first_json(text: str, opener: str = "{") -> Optional[str]:
+    """
+    Find the first balanced JSON object (or array) in text.
+    
+    Walks the string once, tracking nesting depth and string literals so
+    braces inside JSON strings don't end the match early.
+    
+    Args:
+        text: LLM response text, possibly with prose or code fences around the JSON
+        opener: "{" to find an object, "[" to find an array
+    
+    Returns:
+        The JSON substring, or None if no balanced block was found
+    """
+    closer = _CLOSERS[opener]
+    start = text.find(opener)
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escape = False
+    
+    for i in range(start, len(text)):
+        ch = text[i]
+        
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    
+    return None
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON, using orjson when it is installed.
+    
+    Raises json.JSONDecodeError on invalid input either way
+    (orjson.JSONDecodeError is a subclass of it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def parse_json_response(text: str, json_mode: bool = False, opener: str = "{") -> Any:
+    """
+    Parse the JSON payload of an LLM response.
+    
+    In JSON mode the whole response should be JSON, so it is parsed
+    directly; anything else (or a JSON-mode reply that still isn't valid)
+    goes through extract_first_json.
+    
+    Returns:
+        The parsed value, or None if the response contains no JSON block
+    """
+    if json_mode:
+        try:
+            return loads_json(text)
+        except ValueError:
+            pass
+    
+    raw = extract_first_json(text, opener)
+    return loads_json(raw) if raw is not None else None
+
+
+def dumps_json(
+    data: Any,
+    indent: bool = False,
+    sort_keys: bool = True,
+    as_bytes: bool = False,
+) -> Union[str, bytes]:
+    """
+    Serialize data as JSON, using orjson when it is installed.
+    
+    Keys are sorted by default, so equal data gives equal text. Output is
+    compact unless indent is set; as_bytes skips decoding for callers that
+    send it straight out (e.g. request bodies). Values JSON can't represent
+    are converted with str().
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        out = orjson.dumps(data, default=str, option=option)
+        return out if as_bytes else out.decode()
+    
+    text = json.dumps(
+        data,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        default=str,
+    )
+    return text.encode() if as_bytes else text
@@ -4,13 +4,23 @@ Planner Agent - Creates detailed execution plans.
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 
+from langchain_core.messages import HumanMessage
+
 from aol_fire.models import Plan, Task, TaskPriority
 from aol_fire.core import FireConfig
-from aol_fire.llm import create_chat_model
+from aol_fire.llm import JSON_RESPONSE_FORMAT, create_chat_model, create_prompt_prefix
 from aol_fire.agents.prompts import PLANNER_PROMPT
+from aol_fire.agents.parsing import dumps_json, parse_json_response
+
+
+# Number of complexity estimates remembered per planner
+ESTIMATE_CACHE_SIZE = 256
 
 
 class PlannerAgent:
@@ -24,7 +34,12 @@ class PlannerAgent:
     def __init__(self, config: FireConfig):
         self.config = config
         self.llm = create_chat_model(config, "planner")
-        self.llm.system_prompt = PLANNER_PROMPT
+        self._prefix_messages = create_prompt_prefix(config, self.llm.model_name, PLANNER_PROMPT)
+        self._json_mode = config.llm_json_mode
+        self._json_kwargs = {"response_format": JSON_RESPONSE_FORMAT} if self._json_mode else {}
+        
+        # Complexity estimates keyed by a hash of the goal
+        self._estimate_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     
     def create_plan(
         self, 
@@ -43,11 +58,9 @@ class PlannerAgent:
         Returns:
             A Plan object with ordered tasks
         """
-        from langchain_core.messages import HumanMessage
-        
         context_str = ""
         if context:
-            context_str = f"\n\nProject Context:\n{json.dumps(context, indent=2)}"
+            context_str = f"\n\nProject Context:\n{dumps_json(context, indent=True)}"
         
         if existing_files:
             files_str = "\n".join(f"  - {f}" for f in existing_files[:30])
@@ -66,7 +79,9 @@ Remember to:
 
 Respond with a JSON plan as specified in your instructions."""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke(
+            self._prefix_messages + [HumanMessage(content=prompt)], **self._json_kwargs
+        )
         
         # Parse the plan from response
         return self._parse_plan_response(goal, response.content)
@@ -77,15 +92,17 @@ Respond with a JSON plan as specified in your instructions."""
         
         try:
             # Extract JSON from response
-            start = response.find('{')
-            end = response.rfind('}') + 1
+            data = parse_json_response(response, self._json_mode)
+            if data is not None and not isinstance(data, dict):
+                # JSON mode parses the whole reply, which may be any value
+                raise json.JSONDecodeError("Expected a JSON object", response, 0)
             
-            if start != -1 and end > start:
-                data = json.loads(response[start:end])
-                
+            if data:
                 plan.reasoning = data.get("reasoning", "")
                 
                 for task_data in data.get("tasks", []):
+                    if not isinstance(task_data, dict):
+                        continue
                     priority_map = {
                         "high": TaskPriority.HIGH,
                         "medium": TaskPriority.MEDIUM,
@@ -138,8 +155,6 @@ Respond with a JSON plan as specified in your instructions."""
         Returns:
             Updated Plan object
         """
-        from langchain_core.messages import HumanMessage
-        
         completed_str = ""
         if completed_tasks:
             completed_str = "\n".join(
@@ -171,7 +186,9 @@ Should we:
 
 Respond with an updated JSON plan."""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke(
+            self._prefix_messages + [HumanMessage(content=prompt)], **self._json_kwargs
+        )
         
         # Parse and merge with existing plan
         updated = self._parse_plan_response(plan.goal, response.content)
@@ -186,10 +203,16 @@ Respond with an updated JSON plan."""
         """
         Estimate the complexity of a goal before planning.
         
+        Results are memoized per goal.
+        
         Returns:
             Dictionary with complexity metrics
         """
-        from langchain_core.messages import HumanMessage
+        key = hashlib.blake2b(goal.encode(), digest_size=16).hexdigest()
+        cached = self._estimate_cache.get(key)
+        if cached is not None:
+            self._estimate_cache.move_to_end(key)
+            return copy.deepcopy(cached)
         
         prompt = f"""Estimate the complexity of this programming goal:
 
@@ -205,13 +228,17 @@ Respond with JSON:
     "recommended_approach": "brief description"
 }}"""
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self.llm.invoke(
+            self._prefix_messages + [HumanMessage(content=prompt)], **self._json_kwargs
+        )
         
         try:
-            start = response.content.find('{')
-            end = response.content.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(response.content[start:end])
+            estimate = parse_json_response(response.content, self._json_mode)
+            if isinstance(estimate, dict) and estimate:
+                self._estimate_cache[key] = estimate
+                if len(self._estimate_cache) > ESTIMATE_CACHE_SIZE:
+                    self._estimate_cache.popitem(last=False)
+                return copy.deepcopy(estimate)
         except:
             pass
         
@@ -223,3 +250,7 @@ Respond with JSON:
             "potential_challenges": [],
             "recommended_approach": "Standard iterative development",
         }
+    
+    def clear_cache(self) -> None:
+        """Forget memoized complexity estimates."""
+        self._estimate_cache.clear()
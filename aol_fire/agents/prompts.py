@@ -2,6 +2,8 @@
 System prompts for specialized agents.
 """
 
+from types import MappingProxyType
+
 ORCHESTRATOR_PROMPT = """You are the Orchestrator Agent for AOL-CLI Fire Edition - an advanced AI coding assistant.
 
 ## Your Role
@@ -56,6 +58,7 @@ Create detailed, actionable execution plans for programming tasks. Your plans sh
 4. Include verification steps (tests, checks)
 5. Consider edge cases and error handling
 6. Estimate complexity for each task
+7. Tag tasks that can be answered without reading or writing files as "simple"
 
 ## Output Format
 Respond with a JSON plan:
@@ -69,7 +72,7 @@ Respond with a JSON plan:
             "description": "Detailed description of what to do",
             "priority": "high|medium|low",
             "estimated_mins": 5,
-            "tags": ["setup", "code", "test", etc.]
+            "tags": ["setup", "code", "test", "simple", etc.]
         }
     ]
 }
@@ -199,12 +202,12 @@ Present debugging as:
 4. **Verification**: How to confirm it's fixed
 5. **Prevention**: How to avoid in future"""
 
-# Mapping of agent roles to prompts
-AGENT_PROMPTS = {
+# Read-only mapping of agent roles to prompts
+AGENT_PROMPTS = MappingProxyType({
     "orchestrator": ORCHESTRATOR_PROMPT,
     "planner": PLANNER_PROMPT,
     "coder": CODER_PROMPT,
     "researcher": RESEARCHER_PROMPT,
     "reviewer": REVIEWER_PROMPT,
     "debugger": DEBUGGER_PROMPT,
-}
+})
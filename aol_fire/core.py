@@ -5,11 +5,48 @@ Core configuration and agent setup for AOL-CLI Fire Edition.
 from __future__ import annotations
 
 import os
+import time
 import hashlib
+import functools
+import queue
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Literal
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Literal, Tuple
 from pydantic import BaseModel, Field, SecretStr, field_validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+# Environment variables holding each provider's API key
+_PROVIDER_KEY_ENV: Mapping[str, str] = MappingProxyType({
+    "openai": "OPENAI_API_KEY",
+    "venice": "VENICE_API_KEY",
+    "groq": "GROQ_API_KEY",
+    "together": "TOGETHER_API_KEY",
+    "openrouter": "OPENROUTER_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "custom": "CUSTOM_API_KEY",
+})
+
+# Default API base URLs; "custom" is resolved from CUSTOM_API_BASE instead
+_PROVIDER_BASE: Mapping[str, str] = MappingProxyType({
+    "openai": "https://api.openai.com/v1",
+    "venice": "https://api.venice.ai/api/v1",
+    "ollama": "http://localhost:11434/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "together": "https://api.together.xyz/v1",
+    "openrouter": "https://openrouter.ai/api/v1",
+    "anthropic": "https://api.anthropic.com/v1",
+})
+
+_DEFAULT_API_BASE = "http://localhost:8000/v1"
+
+
+@functools.lru_cache(maxsize=128)
+def _ensure_dir(path: str) -> None:
+    """Create a directory (and parents) once per process."""
+    os.makedirs(path, exist_ok=True)
 
 
 class FireConfig(BaseSettings):
@@ -41,6 +78,8 @@ class FireConfig(BaseSettings):
     # Model parameters
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
     max_tokens: int = Field(default=4096)
+    llm_json_mode: bool = Field(default=False)  # Request JSON-only replies where the backend supports it
+    llm_fuzzy_cache: bool = Field(default=False)  # Reuse cached replies for near-identical prompts
     
     # ==========================================================================
     # Agent Behavior
@@ -48,6 +87,7 @@ class FireConfig(BaseSettings):
     
     max_iterations: int = Field(default=100, ge=1, le=500)
     max_task_retries: int = Field(default=3)
+    max_tool_output_chars: int = Field(default=8192, ge=256)  # Per tool result sent to the LLM
     api_timeout: int = Field(default=120, ge=10, le=600)
     
     # Multi-agent
@@ -60,7 +100,7 @@ class FireConfig(BaseSettings):
     # ==========================================================================
     
     workspace_dir: Path = Field(default=Path("./workspace"))
-    data_dir: Path = Field(default=Path.home() / ".aol-fire")
+    data_dir: Path = Field(default_factory=lambda: Path.home() / ".aol-fire")
     
     # ==========================================================================
     # Memory & Persistence
@@ -105,23 +145,36 @@ class FireConfig(BaseSettings):
     enable_safety_checks: bool = Field(default=False)
     confirm_destructive: bool = Field(default=False)
     
-    class Config:
-        env_prefix = "FIRE_"
-        env_file = ".env"
-        extra = "ignore"
+    model_config = SettingsConfigDict(
+        env_prefix="FIRE_",
+        env_file=".env",
+        extra="ignore",
+        frozen=True,  # Instances are shared by build_config
+        validate_default=False,
+    )
     
     @field_validator('workspace_dir', 'data_dir', mode='before')
     @classmethod
     def validate_path(cls, v):
+        if isinstance(v, Path):
+            return v
         if isinstance(v, str):
             return Path(v)
         return v
     
-    @property
+    @functools.cached_property
     def config_hash(self) -> str:
         """Generate a hash of the configuration for caching."""
         config_str = f"{self.llm_provider}:{self.orchestrator_model}:{self.planner_model}"
-        return hashlib.md5(config_str.encode()).hexdigest()[:8]
+        return hashlib.blake2b(config_str.encode(), digest_size=4).hexdigest()
+    
+    @functools.cached_property
+    def _json_bytes(self) -> bytes:
+        return self.__pydantic_serializer__.to_json(self, exclude={"api_key"})
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize the configuration (without the API key) as JSON bytes."""
+        return self._json_bytes
     
     def get_api_key(self) -> Optional[str]:
         """Get the API key as a string."""
@@ -129,17 +182,7 @@ class FireConfig(BaseSettings):
             return self.api_key.get_secret_value()
         
         # Try provider-specific env vars
-        key_map = {
-            "openai": "OPENAI_API_KEY",
-            "venice": "VENICE_API_KEY",
-            "groq": "GROQ_API_KEY",
-            "together": "TOGETHER_API_KEY",
-            "openrouter": "OPENROUTER_API_KEY",
-            "anthropic": "ANTHROPIC_API_KEY",
-            "custom": "CUSTOM_API_KEY",
-        }
-        
-        env_var = key_map.get(self.llm_provider)
+        env_var = _PROVIDER_KEY_ENV.get(self.llm_provider)
         if env_var:
             return os.getenv(env_var)
         return None
@@ -149,35 +192,27 @@ class FireConfig(BaseSettings):
         if self.api_base:
             return self.api_base
         
-        base_map = {
-            "openai": "https://api.openai.com/v1",
-            "venice": "https://api.venice.ai/api/v1",
-            "ollama": "http://localhost:11434/v1",
-            "groq": "https://api.groq.com/openai/v1",
-            "together": "https://api.together.xyz/v1",
-            "openrouter": "https://openrouter.ai/api/v1",
-            "anthropic": "https://api.anthropic.com/v1",
-            "custom": os.getenv("CUSTOM_API_BASE", "http://localhost:8000/v1"),
-        }
+        if self.llm_provider == "custom":
+            return os.getenv("CUSTOM_API_BASE", _DEFAULT_API_BASE)
         
-        return base_map.get(self.llm_provider, "http://localhost:8000/v1")
+        return _PROVIDER_BASE.get(self.llm_provider, _DEFAULT_API_BASE)
     
     def ensure_directories(self) -> None:
         """Ensure required directories exist."""
-        self.workspace_dir.mkdir(parents=True, exist_ok=True)
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(str(self.workspace_dir.resolve()))
         
-        # Create subdirectories
-        (self.data_dir / "sessions").mkdir(exist_ok=True)
-        (self.data_dir / "memory").mkdir(exist_ok=True)
-        (self.data_dir / "plugins").mkdir(exist_ok=True)
+        # Creating the subdirectories also creates data_dir itself
+        data_dir = self.data_dir.resolve()
+        _ensure_dir(str(data_dir / "sessions"))
+        _ensure_dir(str(data_dir / "memory"))
+        _ensure_dir(str(data_dir / "plugins"))
 
 
 # =============================================================================
 # Provider Presets
 # =============================================================================
 
-FIRE_PRESETS: Dict[str, Dict[str, Any]] = {
+_RAW_PRESETS: Dict[str, Dict[str, Any]] = {
     # OpenAI
     "openai": {
         "llm_provider": "openai",
@@ -271,12 +306,42 @@ FIRE_PRESETS: Dict[str, Dict[str, Any]] = {
 }
 
 
-def get_preset(name: str) -> Dict[str, Any]:
-    """Get a provider preset configuration."""
+# Presets are shared constants, so hand out read-only views instead of copies
+FIRE_PRESETS: Dict[str, Mapping[str, Any]] = {
+    name: MappingProxyType(values) for name, values in _RAW_PRESETS.items()
+}
+
+_PRESET_NAMES = ", ".join(FIRE_PRESETS)
+
+_EMPTY_MAP: Mapping[str, Any] = MappingProxyType({})
+
+
+def get_preset(name: str) -> Mapping[str, Any]:
+    """Get a provider preset configuration (read-only)."""
     if name not in FIRE_PRESETS:
-        available = ", ".join(FIRE_PRESETS.keys())
-        raise ValueError(f"Unknown preset '{name}'. Available: {available}")
-    return FIRE_PRESETS[name].copy()
+        raise ValueError(f"Unknown preset '{name}'. Available: {_PRESET_NAMES}")
+    return FIRE_PRESETS[name]
+
+
+@functools.lru_cache(maxsize=32)
+def _build_config_cached(config_items: Tuple, env_key: Tuple) -> FireConfig:
+    """Construct a FireConfig; env_key only takes part in the cache key."""
+    return FireConfig(**dict(config_items))
+
+
+def _env_cache_key() -> Tuple:
+    """Snapshot of the environment inputs FireConfig reads, for cache keys."""
+    path = Path(FireConfig.model_config.get("env_file") or ".env").resolve()
+    try:
+        env_mtime = path.stat().st_mtime
+    except OSError:
+        env_mtime = 0.0
+    
+    prefix = FireConfig.model_config.get("env_prefix", "").upper()
+    env_vars = tuple(sorted(
+        (k, v) for k, v in os.environ.items() if k.upper().startswith(prefix)
+    ))
+    return (str(path), env_mtime, env_vars)
 
 
 def build_config(
@@ -293,17 +358,49 @@ def build_config(
     3. Environment variables
     4. Defaults
     """
-    config_dict = {}
-    
-    # Apply preset
-    if preset:
-        config_dict.update(get_preset(preset))
-    
-    # Override with CLI args
-    if cli_args:
-        config_dict.update({k: v for k, v in cli_args.items() if v is not None})
-    
-    return FireConfig(**config_dict)
+    # Preset values, overridden by CLI args
+    preset_values = get_preset(preset) if preset else _EMPTY_MAP
+    cli_values = (
+        {k: v for k, v in cli_args.items() if v is not None} if cli_args else _EMPTY_MAP
+    )
+    config_dict = preset_values | cli_values
+    
+    config_items = tuple(sorted(config_dict.items()))
+    try:
+        hash(config_items)
+    except TypeError:
+        # Unhashable CLI values (lists etc.) can't be cached
+        return FireConfig(**config_dict)
+    
+    return _build_config_cached(config_items, _env_cache_key())
+
+
+# Compiled workflow graphs, keyed by the id of the (frozen) config they were
+# built from. The config is kept alongside so its id can't be reused.
+GRAPH_CACHE_SIZE = 16
+_graph_cache: "OrderedDict[int, Tuple[FireConfig, Any]]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def _graph_for(config: FireConfig) -> Any:
+    """Get the compiled workflow graph for a config, building it once."""
+    key = id(config)
+    with _graph_cache_lock:
+        entry = _graph_cache.get(key)
+        if entry is not None:
+            _graph_cache.move_to_end(key)
+            return entry[1]
+    
+    # Imported here because the workflow module imports this one
+    from aol_fire.workflow import build_fire_graph
+    
+    graph = build_fire_graph(config)
+    with _graph_cache_lock:
+        entry = _graph_cache.setdefault(key, (config, graph))
+        _graph_cache.move_to_end(key)
+        while len(_graph_cache) > GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+    return entry[1]
 
 
 class FireAgent:
@@ -318,6 +415,13 @@ class FireAgent:
         self.config.ensure_directories()
         self._graph = None
         self._tools = None
+        self._fast_model = None
+    
+    def _get_graph(self) -> Any:
+        """Get the workflow graph, shared by agents using the same config."""
+        if self._graph is None:
+            self._graph = _graph_for(self.config)
+        return self._graph
     
     def run(self, goal: str) -> Dict[str, Any]:
         """
@@ -329,43 +433,94 @@ class FireAgent:
         Returns:
             Final state dictionary with results
         """
-        from aol_fire.workflow import build_fire_graph, create_initial_state
-        
-        if self._graph is None:
-            self._graph = build_fire_graph(self.config)
+        from aol_fire.workflow import create_initial_state
         
         initial_state = create_initial_state(goal, self.config)
-        final_state = self._graph.invoke(initial_state)
+        final_state = self._get_graph().invoke(initial_state)
         
         return final_state
     
     async def run_async(self, goal: str) -> Dict[str, Any]:
         """Async version of run."""
-        from aol_fire.workflow import build_fire_graph, create_initial_state
-        
-        if self._graph is None:
-            self._graph = build_fire_graph(self.config)
+        from aol_fire.llm import aclose_clients
+        from aol_fire.workflow import create_initial_state
         
         initial_state = create_initial_state(goal, self.config)
-        final_state = await self._graph.ainvoke(initial_state)
+        try:
+            final_state = await self._get_graph().ainvoke(initial_state)
+        finally:
+            # Async clients are bound to this loop, which the caller may
+            # close as soon as we return
+            await aclose_clients()
         
         return final_state
     
-    def stream(self, goal: str):
+    def stream(self, goal: str, batch_ms: float = 0.0):
         """
         Stream the agent execution for real-time updates.
         
         Yields state updates as the agent progresses.
-        """
-        from aol_fire.workflow import build_fire_graph, create_initial_state
         
-        if self._graph is None:
-            self._graph = build_fire_graph(self.config)
+        Args:
+            goal: The user's goal/task
+            batch_ms: If positive, yield lists of the events that arrived
+                within each window of this many milliseconds instead of
+                single events
+        """
+        from aol_fire.workflow import create_initial_state
         
         initial_state = create_initial_state(goal, self.config)
+        events = self._get_graph().stream(initial_state)
+        
+        if batch_ms <= 0:
+            yield from events
+            return
+        
+        # The graph is consumed on a background thread, so a batch is
+        # flushed when its window runs out rather than when the next
+        # (possibly slow, LLM-bound) step happens to finish
+        window = batch_ms / 1000
+        pending: "queue.Queue[Any]" = queue.Queue()
+        done = object()
+        errors: List[BaseException] = []
+        
+        def pump() -> None:
+            try:
+                for event in events:
+                    pending.put(event)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                pending.put(done)
+        
+        threading.Thread(target=pump, name="fire-stream", daemon=True).start()
+        
+        batch: List[Any] = []
+        deadline = 0.0
+        
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                event = pending.get(timeout=timeout)
+            except queue.Empty:
+                yield batch
+                batch = []
+                continue
+            
+            if event is done:
+                break
+            if not batch:
+                deadline = time.monotonic() + window
+            batch.append(event)
+            
+            if time.monotonic() >= deadline:
+                yield batch
+                batch = []
         
-        for event in self._graph.stream(initial_state):
-            yield event
+        if batch:
+            yield batch
+        if errors:
+            raise errors[0]
     
     def chat(self, message: str, context: Optional[Dict[str, Any]] = None) -> str:
         """
@@ -378,8 +533,10 @@ class FireAgent:
         Returns:
             Agent response
         """
-        from aol_fire.llm import create_chat_model
+        if self._fast_model is None:
+            from aol_fire.llm import create_chat_model
+            
+            self._fast_model = create_chat_model(self.config, "fast")
         
-        model = create_chat_model(self.config, "fast")
-        response = model.invoke(message)
+        response = self._fast_model.invoke(message)
         return response.content
@@ -6,12 +6,27 @@ Supports multiple providers, streaming, and tool calling.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import atexit
+import email.utils
+import hashlib
+import importlib.util
 import os
-from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+import random
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
 
 import httpx
-from langchain_core.callbacks import CallbackManagerForLLMRun
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import (
     AIMessage,
@@ -22,11 +37,429 @@ from langchain_core.messages import (
     ToolMessage,
 )
 from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
-from pydantic import Field, SecretStr
+from pydantic import ConfigDict, Field, PrivateAttr, SecretStr
 
+from aol_fire.agents.parsing import dumps_json, loads_json
 from aol_fire.core import FireConfig
 
 
+# =============================================================================
+# Shared HTTP clients
+# =============================================================================
+
+# HTTP/2 needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+# Clients are reused across requests so connections (and TLS sessions) stay open
+_client_pool: Dict[Tuple[str, int], httpx.Client] = {}
+_client_pool_lock = threading.Lock()
+
+# Async clients are bound to the event loop they were first used on
+_async_client_pools: "weakref.WeakKeyDictionary[Any, Dict[Tuple[str, int], httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_client(api_base: str, timeout: int) -> httpx.Client:
+    """Get the shared HTTP client for an endpoint."""
+    key = (api_base, timeout)
+    client = _client_pool.get(key)
+    if client is None:
+        with _client_pool_lock:
+            client = _client_pool.get(key)
+            if client is None:
+                client = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=timeout)
+                _client_pool[key] = client
+    return client
+
+
+def _get_async_client(api_base: str, timeout: int) -> httpx.AsyncClient:
+    """Get the shared async HTTP client for an endpoint on the running event loop."""
+    pool = _async_client_pools.setdefault(asyncio.get_running_loop(), {})
+    key = (api_base, timeout)
+    client = pool.get(key)
+    if client is None:
+        client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=timeout)
+        pool[key] = client
+    return client
+
+
+async def aclose_clients() -> None:
+    """
+    Close the async HTTP clients of the running event loop.
+    
+    Call this before the loop shuts down (FireAgent.run_async does); the
+    clients can't be closed from atexit once their loop is gone.
+    """
+    pool = _async_client_pools.pop(asyncio.get_running_loop(), {})
+    for client in pool.values():
+        await client.aclose()
+
+
+@atexit.register
+def _close_clients() -> None:
+    with _client_pool_lock:
+        for client in _client_pool.values():
+            client.close()
+        _client_pool.clear()
+    
+    # Loops that are still usable get their clients closed on them
+    for loop, pool in list(_async_client_pools.items()):
+        if loop.is_closed() or loop.is_running():
+            continue
+        for client in pool.values():
+            try:
+                loop.run_until_complete(client.aclose())
+            except Exception:
+                pass
+    _async_client_pools.clear()
+
+
+# =============================================================================
+# Async request limits
+# =============================================================================
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for async callers.
+    
+    Holds up to `capacity` tokens, refilled at `rate` per second; each
+    request takes one token and waits when the bucket is empty.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Rate limiters keyed by (api_base, rate): models sharing an endpoint and
+# rate share a bucket, and one with a different rate never resets the others'
+_rate_limiters: Dict[Tuple[str, float], TokenBucket] = {}
+
+# Semaphores are bound to the event loop, like the async clients, and keyed
+# by (api_base, limit) so a model with a different limit gets its own
+_api_semaphores: "weakref.WeakKeyDictionary[Any, Dict[Tuple[str, int], asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_rate_limiter(api_base: str, rate: float) -> Optional[TokenBucket]:
+    """Get the token bucket for an endpoint, or None when rate limiting is off."""
+    if rate <= 0:
+        return None
+    key = (api_base, rate)
+    bucket = _rate_limiters.get(key)
+    if bucket is None:
+        bucket = _rate_limiters.setdefault(key, TokenBucket(rate))
+    return bucket
+
+
+def _get_semaphore(api_base: str, limit: int) -> asyncio.Semaphore:
+    """Get the concurrency semaphore for an endpoint on the running event loop."""
+    pool = _api_semaphores.setdefault(asyncio.get_running_loop(), {})
+    key = (api_base, limit)
+    sem = pool.get(key)
+    if sem is None:
+        sem = asyncio.Semaphore(limit)
+        pool[key] = sem
+    return sem
+
+
+# =============================================================================
+# Response cache
+# =============================================================================
+
+# (group key, word set) used to match near-identical prompts
+FuzzySignature = Tuple[str, FrozenSet[str]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+class FireResponseCache:
+    """
+    TTL + LRU cache of chat completions keyed by request payload.
+    
+    Only deterministic requests (temperature 0, not streamed) are cached,
+    so a repeated prompt is answered without another API round-trip.
+    
+    Entries stored with a fuzzy signature can also answer near-miss
+    prompts: same model, tools and system messages, and user text whose
+    word sets overlap by at least FUZZY_THRESHOLD (Jaccard similarity).
+    """
+    
+    MAX_CACHE_SIZE = 1000
+    TTL = 1800.0  # seconds
+    FUZZY_THRESHOLD = 0.85
+    FUZZY_SCAN_LIMIT = 200  # Most recent entries compared on a fuzzy lookup
+    
+    def __init__(self, max_size: int = MAX_CACHE_SIZE, ttl: float = TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[ChatResult, float, Optional[FuzzySignature]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash a request payload into a cache key."""
+        return hashlib.sha256(dumps_json(payload, as_bytes=True)).hexdigest()
+    
+    def get(self, key: str, fuzzy: Optional[FuzzySignature] = None) -> Optional[ChatResult]:
+        """
+        Get a cached result, or None if missing or expired.
+        
+        If fuzzy is given and there is no exact entry, the most similar
+        recent entry with the same fuzzy group is returned instead.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0].model_copy(deep=True)
+            
+            if entry is not None:
+                del self._entries[key]
+            
+            if fuzzy is not None:
+                match = self._find_similar(fuzzy, now)
+                if match is not None:
+                    self.fuzzy_hits += 1
+                    return match.model_copy(deep=True)
+            
+            self.misses += 1
+            return None
+    
+    def _find_similar(self, fuzzy: FuzzySignature, now: float) -> Optional[ChatResult]:
+        """Best fuzzy match among the most recent entries (lock must be held)."""
+        group, words = fuzzy
+        if not words:
+            return None
+        
+        best: Optional[ChatResult] = None
+        best_score = self.FUZZY_THRESHOLD
+        for i, (result, stored_at, other) in enumerate(reversed(self._entries.values())):
+            if i >= self.FUZZY_SCAN_LIMIT:
+                break
+            if other is None or other[0] != group or now - stored_at >= self.ttl:
+                continue
+            score = len(words & other[1]) / len(words | other[1])
+            if score >= best_score:
+                best, best_score = result, score
+        return best
+    
+    def set(self, key: str, result: ChatResult, fuzzy: Optional[FuzzySignature] = None) -> None:
+        """Store a result, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (result.model_copy(deep=True), time.monotonic(), fuzzy)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.fuzzy_hits = self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase text and collapse runs of whitespace."""
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+response_cache = FireResponseCache()
+
+
+# Status codes worth retrying: timeouts, rate limits and server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 429})
+
+
+def _is_retryable(status_code: int) -> bool:
+    """Check if a failed request may succeed when retried."""
+    return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# =============================================================================
+# Streaming
+# =============================================================================
+
+STREAM_CHUNK_SIZE = 8192
+
+
+class SSEDataParser:
+    """
+    Incrementally split a server-sent events byte stream into data payloads.
+    
+    Works on raw bytes so only the JSON payloads are ever parsed, and
+    consumed lines are dropped from the buffer once per fed chunk.
+    """
+    
+    def __init__(self):
+        self._buf = bytearray()
+    
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """Add received bytes and return the payloads of completed ``data:`` lines."""
+        buf = self._buf
+        buf.extend(chunk)
+        
+        payloads = []
+        start = 0
+        while (nl := buf.find(b"\n", start)) != -1:
+            if buf.startswith(b"data: ", start, nl):
+                payloads.append(bytes(buf[start + 6:nl]).rstrip(b"\r"))
+            start = nl + 1
+        
+        del buf[:start]
+        return payloads
+
+
+def _parse_stream_chunk(data: bytes) -> Optional[ChatGenerationChunk]:
+    """Turn one streamed completion delta into a chunk, or None if it carries nothing."""
+    try:
+        chunk_data = loads_json(data)
+    except ValueError:
+        return None
+    
+    delta = chunk_data["choices"][0].get("delta", {})
+    content = delta.get("content", "") or ""
+    
+    # Tool call deltas arrive as fragments keyed by index
+    tool_call_chunks = [
+        {
+            "name": tc.get("function", {}).get("name"),
+            "args": tc.get("function", {}).get("arguments"),
+            "id": tc.get("id"),
+            "index": tc.get("index", i),
+        }
+        for i, tc in enumerate(delta.get("tool_calls") or [])
+    ]
+    
+    if not (content or tool_call_chunks):
+        return None
+    
+    return ChatGenerationChunk(
+        message=AIMessageChunk(content=content, tool_call_chunks=tool_call_chunks)
+    )
+
+
+# =============================================================================
+# Message conversion
+# =============================================================================
+
+def _convert_system(msg: BaseMessage) -> Dict[str, Any]:
+    return {"role": "system", "content": msg.content}
+
+
+def _convert_human(msg: BaseMessage) -> Dict[str, Any]:
+    return {"role": "user", "content": msg.content}
+
+
+def _convert_ai(msg: BaseMessage) -> Dict[str, Any]:
+    msg_dict = {"role": "assistant", "content": msg.content or ""}
+    if msg.tool_calls:
+        msg_dict["tool_calls"] = [
+            {
+                "id": tc.get("id", f"call_{i}"),
+                "type": "function",
+                "function": {
+                    "name": tc.get("name", ""),
+                    # Sorted so a replayed call serializes to the same prompt bytes
+                    "arguments": dumps_json(tc.get("args", {}))
+                }
+            }
+            for i, tc in enumerate(msg.tool_calls)
+        ]
+    return msg_dict
+
+
+def _convert_tool(msg: BaseMessage) -> Dict[str, Any]:
+    return {
+        "role": "tool",
+        "content": str(msg.content),
+        "tool_call_id": msg.tool_call_id
+    }
+
+
+def _convert_other(msg: BaseMessage) -> Dict[str, Any]:
+    return {"role": "user", "content": str(msg.content)}
+
+
+# Checked in order for message classes not yet in _MESSAGE_CONVERTERS
+_BASE_CONVERTERS = (
+    (SystemMessage, _convert_system),
+    (HumanMessage, _convert_human),
+    (AIMessage, _convert_ai),
+    (ToolMessage, _convert_tool),
+)
+
+# Converter per exact message class, filled in as new classes are seen
+_MESSAGE_CONVERTERS = {cls: convert for cls, convert in _BASE_CONVERTERS}
+
+
+def _converter_for(cls: type) -> Any:
+    """Get the API-format converter for a message class."""
+    convert = _MESSAGE_CONVERTERS.get(cls)
+    if convert is None:
+        convert = next(
+            (c for base, c in _BASE_CONVERTERS if issubclass(cls, base)),
+            _convert_other,
+        )
+        _MESSAGE_CONVERTERS[cls] = convert
+    return convert
+
+
 class FireChatModel(BaseChatModel):
     """
     Unified chat model for AOL-CLI Fire Edition.
@@ -55,12 +488,26 @@ class FireChatModel(BaseChatModel):
     # System prompt injection
     system_prompt: Optional[str] = None
     
-    # Retry configuration
+    # Let near-identical prompts share cached responses (temperature 0 only)
+    fuzzy_cache: bool = False
+    
+    # Retry configuration (exponential backoff with jitter)
     max_retries: int = 3
     retry_delay: float = 1.0
+    max_backoff_s: float = 30.0
+    jitter: float = 0.5
+    
+    # Async request limits, shared per api_base (requests_per_second=0 disables)
+    max_concurrent: int = 8
+    requests_per_second: float = 10.0
+    
+    model_config = ConfigDict(arbitrary_types_allowed=True)
     
-    class Config:
-        arbitrary_types_allowed = True
+    _headers: Dict[str, str] = PrivateAttr(default_factory=dict)
+    # Last converted history: (messages, their API dicts) for append-only reuse
+    _converted: Tuple[Tuple[BaseMessage, ...], List[Dict[str, Any]]] = PrivateAttr(
+        default=((), [])
+    )
     
     @property
     def _llm_type(self) -> str:
@@ -74,7 +521,11 @@ class FireChatModel(BaseChatModel):
             "temperature": self.temperature,
         }
     
-    def _get_headers(self) -> Dict[str, str]:
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._headers = self._build_headers()
+    
+    def _build_headers(self) -> Dict[str, str]:
         """Build request headers."""
         headers = {"Content-Type": "application/json"}
         
@@ -85,8 +536,27 @@ class FireChatModel(BaseChatModel):
         headers.update(self.extra_headers)
         return headers
     
+    def _get_headers(self) -> Dict[str, str]:
+        """Get the request headers, built once per model (httpx copies them)."""
+        return self._headers
+    
     def _convert_messages(self, messages: List[BaseMessage]) -> List[Dict[str, Any]]:
-        """Convert LangChain messages to API format."""
+        """
+        Convert LangChain messages to API format.
+        
+        Agent loops resend the same history with a few messages appended,
+        so when the previous call's messages are a prefix of this one (same
+        objects), their converted dicts are reused and only the new tail is
+        converted.
+        """
+        prev_msgs, prev_dicts = self._converted
+        n = len(prev_msgs)
+        if n and len(messages) >= n and all(a is b for a, b in zip(messages, prev_msgs)):
+            base = prev_dicts + [_converter_for(type(m))(m) for m in messages[n:]]
+        else:
+            base = [_converter_for(type(m))(m) for m in messages]
+        self._converted = (tuple(messages), base)
+        
         converted = []
         
         # Inject system prompt if needed
@@ -95,34 +565,17 @@ class FireChatModel(BaseChatModel):
             if not has_system:
                 converted.append({"role": "system", "content": self.system_prompt})
         
-        for msg in messages:
-            if isinstance(msg, SystemMessage):
-                converted.append({"role": "system", "content": msg.content})
-            elif isinstance(msg, HumanMessage):
-                converted.append({"role": "user", "content": msg.content})
-            elif isinstance(msg, AIMessage):
-                msg_dict = {"role": "assistant", "content": msg.content or ""}
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    msg_dict["tool_calls"] = [
-                        {
-                            "id": tc.get("id", f"call_{i}"),
-                            "type": "function",
-                            "function": {
-                                "name": tc.get("name", ""),
-                                "arguments": json.dumps(tc.get("args", {}))
-                            }
-                        }
-                        for i, tc in enumerate(msg.tool_calls)
-                    ]
-                converted.append(msg_dict)
-            elif isinstance(msg, ToolMessage):
-                converted.append({
-                    "role": "tool",
-                    "content": str(msg.content),
-                    "tool_call_id": msg.tool_call_id
-                })
-            else:
-                converted.append({"role": "user", "content": str(msg.content)})
+        for msg, msg_dict in zip(messages, base):
+            # Cache breakpoint requested by the caller (see CoderAgent); it
+            # moves between calls, so it's applied to a copy, not the cached dict
+            cache_control = msg.additional_kwargs.get("cache_control")
+            if cache_control and isinstance(msg_dict["content"], str):
+                msg_dict = {**msg_dict, "content": [{
+                    "type": "text",
+                    "text": msg_dict["content"],
+                    "cache_control": cache_control,
+                }]}
+            converted.append(msg_dict)
         
         return converted
     
@@ -132,7 +585,14 @@ class FireChatModel(BaseChatModel):
         stop: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
-        """Build the request payload."""
+        """
+        Build the request payload.
+        
+        Keys are always added in the same order (model, messages,
+        temperature, max_tokens, tools, tool_choice, stop, ...) so requests
+        that share a model, system prompt and history serialize to the same
+        leading bytes, which provider-side prompt caching relies on.
+        """
         payload = {
             "model": self.model_name,
             "messages": self._convert_messages(messages),
@@ -142,20 +602,87 @@ class FireChatModel(BaseChatModel):
         if self.max_tokens:
             payload["max_tokens"] = self.max_tokens
         
-        if stop:
-            payload["stop"] = stop
-        
         if "tools" in kwargs:
             payload["tools"] = kwargs["tools"]
         
         if "tool_choice" in kwargs:
             payload["tool_choice"] = kwargs["tool_choice"]
         
+        if stop:
+            payload["stop"] = stop
+        
+        if "response_format" in kwargs:
+            payload["response_format"] = kwargs["response_format"]
+        
         if self.streaming:
             payload["stream"] = True
         
         return payload
     
+    def _response_cache_key(
+        self, payload: Dict[str, Any]
+    ) -> Tuple[Optional[str], Optional[FuzzySignature]]:
+        """
+        Cache key and fuzzy signature for a request.
+        
+        The key is None if the response shouldn't be cached. With
+        fuzzy_cache, user message text is normalized before hashing and a
+        fuzzy signature is returned for near-miss lookups.
+        """
+        if self.temperature != 0 or self.streaming:
+            return None, None
+        if not self.fuzzy_cache:
+            return response_cache.make_key(payload), None
+        
+        messages = []
+        texts = []
+        for msg in payload["messages"]:
+            if msg["role"] == "user" and isinstance(msg["content"], str):
+                text = normalize_prompt(msg["content"])
+                texts.append(text)
+                msg = {**msg, "content": text}
+            messages.append(msg)
+        
+        key = response_cache.make_key({**payload, "messages": messages})
+        group = response_cache.make_key({
+            **payload,
+            "messages": [
+                {**msg, "content": ""} if msg["role"] == "user" else msg for msg in messages
+            ],
+        })
+        return key, (group, frozenset(_WORD_RE.findall(" ".join(texts))))
+    
+    @staticmethod
+    def cache_stats() -> Dict[str, int]:
+        """Get response cache hit/miss counters."""
+        return response_cache.stats()
+    
+    def set_rate_limit(self, rps: float) -> None:
+        """Change the async request rate for this model's endpoint (0 disables it)."""
+        self.requests_per_second = rps
+    
+    async def _throttle(self) -> None:
+        """Wait for a rate-limit token before sending a request."""
+        bucket = _get_rate_limiter(self.api_base, self.requests_per_second)
+        if bucket is not None:
+            await bucket.acquire()
+    
+    def _compute_backoff(self, attempt: int, error: Exception) -> float:
+        """
+        Seconds to wait before retrying a failed request.
+        
+        Honors the server's Retry-After header when present; otherwise
+        backs off exponentially from retry_delay with random jitter so
+        concurrent clients don't retry in lock-step.
+        """
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = _parse_retry_after(error.response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(self.max_backoff_s, retry_after)
+        
+        delay = min(self.max_backoff_s, self.retry_delay * 2 ** attempt)
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+    
     def _parse_response(self, result: Dict[str, Any]) -> ChatResult:
         """Parse API response into ChatResult."""
         choice = result["choices"][0]
@@ -168,7 +695,7 @@ class FireChatModel(BaseChatModel):
                 {
                     "id": tc["id"],
                     "name": tc["function"]["name"],
-                    "args": json.loads(tc["function"]["arguments"])
+                    "args": loads_json(tc["function"]["arguments"])
                 }
                 for tc in message["tool_calls"]
             ]
@@ -203,28 +730,36 @@ class FireChatModel(BaseChatModel):
         payload = self._build_payload(messages, stop, **kwargs)
         endpoint = f"{self.api_base.rstrip('/')}/chat/completions"
         
-        with httpx.Client(timeout=self.timeout) as client:
-            for attempt in range(self.max_retries):
-                try:
-                    response = client.post(
-                        endpoint,
-                        headers=self._get_headers(),
-                        json=payload,
-                    )
-                    response.raise_for_status()
-                    return self._parse_response(response.json())
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 429 and attempt < self.max_retries - 1:
-                        import time
-                        time.sleep(self.retry_delay * (attempt + 1))
-                        continue
-                    raise ValueError(f"API error: {e.response.status_code} - {e.response.text}")
-                except httpx.RequestError as e:
-                    if attempt < self.max_retries - 1:
-                        import time
-                        time.sleep(self.retry_delay)
-                        continue
-                    raise ValueError(f"Request failed: {str(e)}")
+        cache_key, fuzzy = self._response_cache_key(payload)
+        if cache_key is not None:
+            cached = response_cache.get(cache_key, fuzzy)
+            if cached is not None:
+                return cached
+        
+        body = dumps_json(payload, sort_keys=False, as_bytes=True)
+        client = _get_client(self.api_base, self.timeout)
+        for attempt in range(self.max_retries):
+            try:
+                response = client.post(
+                    endpoint,
+                    headers=self._get_headers(),
+                    content=body,
+                )
+                response.raise_for_status()
+                result = self._parse_response(loads_json(response.content))
+                if cache_key is not None:
+                    response_cache.set(cache_key, result, fuzzy)
+                return result
+            except httpx.HTTPStatusError as e:
+                if _is_retryable(e.response.status_code) and attempt < self.max_retries - 1:
+                    time.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"API error: {e.response.status_code} - {e.response.text}")
+            except httpx.RequestError as e:
+                if attempt < self.max_retries - 1:
+                    time.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"Request failed: {str(e)}")
         
         raise ValueError("Max retries exceeded")
     
@@ -239,28 +774,39 @@ class FireChatModel(BaseChatModel):
         payload = self._build_payload(messages, stop, **kwargs)
         endpoint = f"{self.api_base.rstrip('/')}/chat/completions"
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            for attempt in range(self.max_retries):
-                try:
+        cache_key, fuzzy = self._response_cache_key(payload)
+        if cache_key is not None:
+            cached = response_cache.get(cache_key, fuzzy)
+            if cached is not None:
+                return cached
+        
+        body = dumps_json(payload, sort_keys=False, as_bytes=True)
+        client = _get_async_client(self.api_base, self.timeout)
+        sem = _get_semaphore(self.api_base, self.max_concurrent)
+        for attempt in range(self.max_retries):
+            await self._throttle()
+            try:
+                async with sem:
                     response = await client.post(
                         endpoint,
                         headers=self._get_headers(),
-                        json=payload,
+                        content=body,
                     )
-                    response.raise_for_status()
-                    return self._parse_response(response.json())
-                except httpx.HTTPStatusError as e:
-                    if e.response.status_code == 429 and attempt < self.max_retries - 1:
-                        import asyncio
-                        await asyncio.sleep(self.retry_delay * (attempt + 1))
-                        continue
-                    raise ValueError(f"API error: {e.response.status_code} - {e.response.text}")
-                except httpx.RequestError as e:
-                    if attempt < self.max_retries - 1:
-                        import asyncio
-                        await asyncio.sleep(self.retry_delay)
-                        continue
-                    raise ValueError(f"Request failed: {str(e)}")
+                response.raise_for_status()
+                result = self._parse_response(loads_json(response.content))
+                if cache_key is not None:
+                    response_cache.set(cache_key, result, fuzzy)
+                return result
+            except httpx.HTTPStatusError as e:
+                if _is_retryable(e.response.status_code) and attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"API error: {e.response.status_code} - {e.response.text}")
+            except httpx.RequestError as e:
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"Request failed: {str(e)}")
         
         raise ValueError("Max retries exceeded")
     
@@ -271,41 +817,121 @@ class FireChatModel(BaseChatModel):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> Iterator[ChatGenerationChunk]:
-        """Stream response from the model."""
+        """
+        Stream response from the model.
+        
+        Failed requests are retried like in _generate, but only until the
+        first chunk has been yielded; after that an error is raised.
+        """
         payload = self._build_payload(messages, stop, **kwargs)
         payload["stream"] = True
         endpoint = f"{self.api_base.rstrip('/')}/chat/completions"
         
-        with httpx.Client(timeout=self.timeout) as client:
-            with client.stream(
-                "POST",
-                endpoint,
-                headers=self._get_headers(),
-                json=payload,
-            ) as response:
-                response.raise_for_status()
-                
-                for line in response.iter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-                        
-                        try:
-                            chunk_data = json.loads(data)
-                            delta = chunk_data["choices"][0].get("delta", {})
-                            content = delta.get("content", "")
+        body = dumps_json(payload, sort_keys=False, as_bytes=True)
+        client = _get_client(self.api_base, self.timeout)
+        on_token = run_manager.on_llm_new_token if run_manager is not None else None
+        for attempt in range(self.max_retries):
+            started = False
+            try:
+                with client.stream(
+                    "POST",
+                    endpoint,
+                    headers=self._get_headers(),
+                    content=body,
+                ) as response:
+                    if response.is_error:
+                        response.read()  # so the error can show the body
+                    response.raise_for_status()
+                    
+                    parser = SSEDataParser()
+                    feed = parser.feed
+                    
+                    for raw in response.iter_bytes(STREAM_CHUNK_SIZE):
+                        for data in feed(raw):
+                            if data == b"[DONE]":
+                                return
                             
-                            if content:
-                                chunk = ChatGenerationChunk(
-                                    message=AIMessageChunk(content=content)
-                                )
+                            chunk = _parse_stream_chunk(data)
+                            if chunk is not None:
+                                started = True
                                 yield chunk
                                 
-                                if run_manager:
-                                    run_manager.on_llm_new_token(content)
-                        except json.JSONDecodeError:
-                            continue
+                                # Tool-call fragments go to callbacks too, with an empty token
+                                if on_token is not None:
+                                    on_token(chunk.message.content, chunk=chunk)
+                return
+            except httpx.HTTPStatusError as e:
+                if _is_retryable(e.response.status_code) and attempt < self.max_retries - 1:
+                    time.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"API error: {e.response.status_code} - {e.response.text}")
+            except httpx.RequestError as e:
+                if not started and attempt < self.max_retries - 1:
+                    time.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"Request failed: {str(e)}")
+        
+        raise ValueError("Max retries exceeded")
+    
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Async stream response from the model, retried like _stream."""
+        payload = self._build_payload(messages, stop, **kwargs)
+        payload["stream"] = True
+        endpoint = f"{self.api_base.rstrip('/')}/chat/completions"
+        
+        body = dumps_json(payload, sort_keys=False, as_bytes=True)
+        client = _get_async_client(self.api_base, self.timeout)
+        sem = _get_semaphore(self.api_base, self.max_concurrent)
+        on_token = run_manager.on_llm_new_token if run_manager is not None else None
+        for attempt in range(self.max_retries):
+            started = False
+            await self._throttle()
+            try:
+                async with sem:
+                    async with client.stream(
+                        "POST",
+                        endpoint,
+                        headers=self._get_headers(),
+                        content=body,
+                    ) as response:
+                        if response.is_error:
+                            await response.aread()
+                        response.raise_for_status()
+                        
+                        parser = SSEDataParser()
+                        feed = parser.feed
+                        
+                        async for raw in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                            for data in feed(raw):
+                                if data == b"[DONE]":
+                                    return
+                                
+                                chunk = _parse_stream_chunk(data)
+                                if chunk is not None:
+                                    started = True
+                                    yield chunk
+                                    
+                                    if on_token is not None:
+                                        await on_token(chunk.message.content, chunk=chunk)
+                return
+            except httpx.HTTPStatusError as e:
+                if _is_retryable(e.response.status_code) and attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"API error: {e.response.status_code} - {e.response.text}")
+            except httpx.RequestError as e:
+                if not started and attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._compute_backoff(attempt, e))
+                    continue
+                raise ValueError(f"Request failed: {str(e)}")
+        
+        raise ValueError("Max retries exceeded")
 
 
 def create_chat_model(
@@ -345,9 +971,82 @@ def create_chat_model(
         max_tokens=config.max_tokens,
         timeout=config.api_timeout,
         extra_headers=extra_headers,
+        fuzzy_cache=config.llm_fuzzy_cache,
     )
 
 
+# Providers that cache repeated prompt prefixes server-side
+PROMPT_CACHING_PROVIDERS = frozenset({"openai", "anthropic", "openrouter"})
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# OpenAI-style response_format requesting a reply that is a single JSON object
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
+def uses_cache_control(config: FireConfig, model_name: str) -> bool:
+    """Check if the model needs explicit cache_control breakpoints (Claude)."""
+    return config.llm_provider == "anthropic" or "claude" in model_name.lower()
+
+
+def supports_prompt_caching(config: FireConfig, model_name: str) -> bool:
+    """Check if repeated prompt prefixes are cached by the provider."""
+    return config.llm_provider in PROMPT_CACHING_PROVIDERS or uses_cache_control(config, model_name)
+
+
+def create_prompt_prefix(
+    config: FireConfig,
+    model_name: str,
+    system_prompt: str,
+) -> List[BaseMessage]:
+    """
+    Build the static message prefix for an agent.
+    
+    The prefix is byte-identical across calls so provider-side prompt
+    caching can reuse it. Claude models get an explicit ``cache_control``
+    marker; OpenAI-compatible providers cache stable prefixes automatically.
+    
+    Args:
+        config: Fire configuration
+        model_name: Model the prefix will be sent to
+        system_prompt: The agent's system prompt
+    
+    Returns:
+        List of messages to prepend to every request
+    """
+    if uses_cache_control(config, model_name):
+        content: Union[str, List[Union[str, Dict]]] = [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": CACHE_CONTROL,
+        }]
+    else:
+        content = system_prompt
+    
+    return [SystemMessage(content=content)]
+
+
+# JSON schema per args_schema class; schemas never change for a given class
+_TOOL_SCHEMA_CACHE: "weakref.WeakKeyDictionary[type, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def tool_args_schema(tool: Any) -> Dict[str, Any]:
+    """
+    Get the JSON schema for a tool's arguments, generated once per schema class.
+    
+    The returned dict is shared between callers and must not be modified.
+    """
+    args_schema = getattr(tool, "args_schema", None)
+    if args_schema is None:
+        return {}
+    
+    schema = _TOOL_SCHEMA_CACHE.get(args_schema)
+    if schema is None:
+        schema = args_schema.model_json_schema()
+        _TOOL_SCHEMA_CACHE[args_schema] = schema
+    return schema
+
+
 def create_tool_calling_model(
     config: FireConfig,
     tools: List[Any],
@@ -360,7 +1059,7 @@ def create_tool_calling_model(
     tool_defs = []
     for tool in tools:
         if hasattr(tool, 'name') and hasattr(tool, 'description'):
-            schema = tool.args_schema.model_json_schema() if hasattr(tool, 'args_schema') else {}
+            schema = tool_args_schema(tool)
             tool_defs.append({
                 "type": "function",
                 "function": {
@@ -11,12 +11,16 @@ This module provides comprehensive data structures for:
 
 from __future__ import annotations
 
+import itertools
+import secrets
+import time
 import uuid
+from collections import defaultdict, deque
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union, Literal
-from pydantic import BaseModel, Field, field_validator, computed_field
+from typing import Any, Deque, Dict, List, Optional, Union, Literal
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_serializer, field_validator
 
 
 # =============================================================================
@@ -75,9 +79,27 @@ class MemoryType(str, Enum):
 # Core Models
 # =============================================================================
 
+# Bumped whenever any task is created or changes status, so plans know
+# when their cached status counts are stale
+_task_status_versions = itertools.count()
+_task_status_version = next(_task_status_versions)
+
+
+def _short_id() -> str:
+    """Random 8-hex-character id for in-session objects."""
+    return secrets.token_hex(4)
+
+
+def _bump_task_status_version() -> None:
+    global _task_status_version
+    _task_status_version = next(_task_status_versions)
+
+
 class ToolCall(BaseModel):
     """Record of a tool invocation."""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    model_config = ConfigDict(frozen=True)
+    
+    id: str = Field(default_factory=_short_id)
     tool_name: str
     arguments: Dict[str, Any] = Field(default_factory=dict)
     result: Optional[str] = None
@@ -92,6 +114,8 @@ class ToolCall(BaseModel):
 
 class FileChange(BaseModel):
     """Record of a file modification."""
+    model_config = ConfigDict(frozen=True)
+    
     path: str
     action: Literal["created", "modified", "deleted", "moved"]
     old_path: Optional[str] = None  # For moves/renames
@@ -106,7 +130,7 @@ class Task(BaseModel):
     Tasks can have dependencies, subtasks, and rich metadata
     for tracking progress and results.
     """
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     title: str
     description: str = ""
     status: TaskStatus = TaskStatus.PENDING
@@ -137,6 +161,14 @@ class Task(BaseModel):
     tags: List[str] = Field(default_factory=list)
     context: Dict[str, Any] = Field(default_factory=dict)
     
+    def model_post_init(self, __context: Any) -> None:
+        _bump_task_status_version()
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "status":
+            _bump_task_status_version()
+    
     def start(self) -> None:
         """Mark task as started."""
         self.status = TaskStatus.IN_PROGRESS
@@ -160,7 +192,6 @@ class Task(BaseModel):
         self.subtasks.append(subtask)
         return subtask
     
-    @computed_field
     @property
     def duration_ms(self) -> Optional[int]:
         """Calculate execution duration."""
@@ -186,7 +217,7 @@ class Plan(BaseModel):
     """
     Execution plan containing tasks and metadata.
     """
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     goal: str
     reasoning: str = ""
     tasks: List[Task] = Field(default_factory=list)
@@ -204,46 +235,84 @@ class Plan(BaseModel):
     estimated_total_mins: Optional[int] = None
     tags: List[str] = Field(default_factory=list)
     
+    # (task status version, task count, tasks list, tasks per status)
+    _status_cache: Optional[tuple] = PrivateAttr(default=None)
+    
     def add_task(self, title: str, **kwargs) -> Task:
         """Add a task to the plan."""
         task = Task(title=title, **kwargs)
         self.tasks.append(task)
         return task
     
+    def _status_index(self) -> Dict[TaskStatus, List[Task]]:
+        """Tasks grouped by status in plan order, rebuilt only after a task changed."""
+        cache = self._status_cache
+        if (
+            cache is None
+            or cache[0] != _task_status_version
+            or cache[1] != len(self.tasks)
+            or cache[2] is not self.tasks
+        ):
+            index: Dict[TaskStatus, List[Task]] = defaultdict(list)
+            for task in self.tasks:
+                index[TaskStatus(task.status)].append(task)
+            cache = (_task_status_version, len(self.tasks), self.tasks, index)
+            self._status_cache = cache
+        return cache[3]
+    
+    def _tasks_with(self, status: TaskStatus) -> List[Task]:
+        return list(self._status_index().get(status, ()))
+    
+    def count(self, status: TaskStatus) -> int:
+        """Number of tasks with the given status."""
+        return len(self._status_index().get(status, ()))
+    
+    @property
+    def completed_count(self) -> int:
+        return self.count(TaskStatus.COMPLETED)
+    
+    @property
+    def failed_count(self) -> int:
+        return self.count(TaskStatus.FAILED)
+    
     @property
     def pending_tasks(self) -> List[Task]:
-        return [t for t in self.tasks if t.status == TaskStatus.PENDING]
+        return self._tasks_with(TaskStatus.PENDING)
     
     @property
     def completed_tasks(self) -> List[Task]:
-        return [t for t in self.tasks if t.status == TaskStatus.COMPLETED]
+        return self._tasks_with(TaskStatus.COMPLETED)
     
     @property
     def failed_tasks(self) -> List[Task]:
-        return [t for t in self.tasks if t.status == TaskStatus.FAILED]
+        return self._tasks_with(TaskStatus.FAILED)
     
     @property
     def current_task(self) -> Optional[Task]:
-        pending = self.pending_tasks
+        pending = self._status_index().get(TaskStatus.PENDING)
         return pending[0] if pending else None
     
     @property
     def is_complete(self) -> bool:
-        return all(t.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED) 
-                   for t in self.tasks)
+        finished = (
+            self.count(TaskStatus.COMPLETED)
+            + self.count(TaskStatus.FAILED)
+            + self.count(TaskStatus.CANCELLED)
+        )
+        return finished == len(self.tasks)
     
     @property
     def progress(self) -> float:
         if not self.tasks:
             return 0.0
-        return (len(self.completed_tasks) / len(self.tasks)) * 100
+        return (self.completed_count / len(self.tasks)) * 100
     
     @property
     def success_rate(self) -> float:
-        completed = len(self.completed_tasks) + len(self.failed_tasks)
+        completed = self.completed_count + self.failed_count
         if completed == 0:
             return 0.0
-        return (len(self.completed_tasks) / completed) * 100
+        return (self.completed_count / completed) * 100
 
 
 class MemoryEntry(BaseModel):
@@ -264,15 +333,21 @@ class MemoryEntry(BaseModel):
         self.last_accessed = datetime.now()
 
 
+# Oldest conversation messages are dropped past this many
+MAX_CONVERSATION_MESSAGES = 1000
+
+
 class Memory(BaseModel):
     """
     Agent memory system with multiple memory types.
     """
-    session_id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    session_id: str = Field(default_factory=_short_id)
     entries: List[MemoryEntry] = Field(default_factory=list)
     
-    # Conversation history (short-term)
-    conversation: List[Dict[str, str]] = Field(default_factory=list)
+    # Conversation history (short-term, bounded)
+    conversation: Deque[Dict[str, Any]] = Field(
+        default_factory=lambda: deque(maxlen=MAX_CONVERSATION_MESSAGES)
+    )
     
     # Working context (current task context)
     working_context: Dict[str, Any] = Field(default_factory=dict)
@@ -284,6 +359,31 @@ class Memory(BaseModel):
     # Learned patterns
     patterns: List[str] = Field(default_factory=list)
     
+    # (entries list, entry count, entries per type)
+    _type_cache: Optional[tuple] = PrivateAttr(default=None)
+    
+    @field_validator('conversation', mode='after')
+    @classmethod
+    def bound_conversation(cls, v):
+        if v.maxlen != MAX_CONVERSATION_MESSAGES:
+            return deque(v, maxlen=MAX_CONVERSATION_MESSAGES)
+        return v
+    
+    @field_serializer('conversation')
+    def serialize_conversation(self, v):
+        return list(v)
+    
+    def _type_index(self) -> Dict[MemoryType, List[MemoryEntry]]:
+        """Entries grouped by type, rebuilt only if entries changed outside add_entry."""
+        cache = self._type_cache
+        if cache is None or cache[0] is not self.entries or cache[1] != len(self.entries):
+            index: Dict[MemoryType, List[MemoryEntry]] = defaultdict(list)
+            for entry in self.entries:
+                index[entry.type].append(entry)
+            cache = (self.entries, len(self.entries), index)
+            self._type_cache = cache
+        return cache[2]
+    
     def add_entry(
         self, 
         content: str, 
@@ -298,20 +398,26 @@ class Memory(BaseModel):
             importance=importance,
             metadata=metadata
         )
+        index = self._type_index()
         self.entries.append(entry)
+        index[entry.type].append(entry)
+        self._type_cache = (self.entries, len(self.entries), index)
         return entry
     
     def add_message(self, role: str, content: str) -> None:
-        """Add a conversation message."""
+        """Add a conversation message (ts is a Unix timestamp)."""
         self.conversation.append({
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat()
+            "ts": time.time(),
         })
     
-    def get_recent_conversation(self, limit: int = 20) -> List[Dict[str, str]]:
+    def get_recent_conversation(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent conversation history."""
-        return self.conversation[-limit:]
+        # Walk back from the newest end so the cost is O(limit), not O(history)
+        recent = list(itertools.islice(reversed(self.conversation), limit))
+        recent.reverse()
+        return recent
     
     def search(
         self, 
@@ -322,10 +428,9 @@ class Memory(BaseModel):
         """Search memories (basic keyword search, can be enhanced with embeddings)."""
         results = []
         query_lower = query.lower()
+        candidates = self._type_index().get(type, ()) if type else self.entries
         
-        for entry in self.entries:
-            if type and entry.type != type:
-                continue
+        for entry in candidates:
             if query_lower in entry.content.lower():
                 results.append(entry)
                 entry.access()
@@ -352,7 +457,9 @@ class Memory(BaseModel):
 
 class AgentMessage(BaseModel):
     """Message in agent communication."""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    model_config = ConfigDict(frozen=True)
+    
+    id: str = Field(default_factory=_short_id)
     from_agent: AgentRole
     to_agent: Optional[AgentRole] = None  # None = broadcast
     content: str
@@ -368,7 +475,7 @@ class AgentState(BaseModel):
     This is the primary state object that flows through the LangGraph workflow.
     """
     # Session info
-    session_id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    session_id: str = Field(default_factory=_short_id)
     started_at: datetime = Field(default_factory=datetime.now)
     
     # User input
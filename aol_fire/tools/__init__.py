@@ -10,103 +10,127 @@ Includes:
 - Project understanding
 """
 
-from aol_fire.tools.file_tools import (
-    ReadFileTool,
-    WriteFileTool,
-    EditFileTool,
-    SearchFilesTool,
-    ListDirectoryTool,
-    CreateDirectoryTool,
-    DeletePathTool,
-    MovePathTool,
-)
-from aol_fire.tools.shell_tools import (
-    ExecuteCommandTool,
-    BackgroundCommandTool,
-)
-from aol_fire.tools.web_tools import (
-    WebSearchTool,
-    FetchURLTool,
-)
-from aol_fire.tools.code_tools import (
-    AnalyzeCodeTool,
-    RunPythonTool,
-)
-from aol_fire.tools.git_tools import (
-    GitStatusTool,
-    GitCommitTool,
-    GitDiffTool,
-)
-from aol_fire.tools.project_tools import (
-    AnalyzeProjectTool,
-)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from aol_fire.core import FireConfig
-from typing import List
-from langchain_core.tools import BaseTool
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+    
+    from aol_fire.tools.file_tools import (
+        ReadFileTool,
+        WriteFileTool,
+        EditFileTool,
+        SearchFilesTool,
+        ListDirectoryTool,
+        CreateDirectoryTool,
+        DeletePathTool,
+        MovePathTool,
+    )
+    from aol_fire.tools.shell_tools import (
+        ExecuteCommandTool,
+        BackgroundCommandTool,
+    )
+    from aol_fire.tools.web_tools import (
+        WebSearchTool,
+        FetchURLTool,
+    )
+    from aol_fire.tools.code_tools import (
+        AnalyzeCodeTool,
+        RunPythonTool,
+    )
+    from aol_fire.tools.git_tools import (
+        GitStatusTool,
+        GitCommitTool,
+        GitDiffTool,
+    )
+    from aol_fire.tools.project_tools import (
+        AnalyzeProjectTool,
+    )
+
+
+# Tool classes are imported on first access, so features turned off in
+# FireConfig never load their modules
+_LAZY_IMPORTS = {
+    "ReadFileTool": "aol_fire.tools.file_tools",
+    "WriteFileTool": "aol_fire.tools.file_tools",
+    "EditFileTool": "aol_fire.tools.file_tools",
+    "SearchFilesTool": "aol_fire.tools.file_tools",
+    "ListDirectoryTool": "aol_fire.tools.file_tools",
+    "CreateDirectoryTool": "aol_fire.tools.file_tools",
+    "DeletePathTool": "aol_fire.tools.file_tools",
+    "MovePathTool": "aol_fire.tools.file_tools",
+    "ExecuteCommandTool": "aol_fire.tools.shell_tools",
+    "BackgroundCommandTool": "aol_fire.tools.shell_tools",
+    "WebSearchTool": "aol_fire.tools.web_tools",
+    "FetchURLTool": "aol_fire.tools.web_tools",
+    "AnalyzeCodeTool": "aol_fire.tools.code_tools",
+    "RunPythonTool": "aol_fire.tools.code_tools",
+    "GitStatusTool": "aol_fire.tools.git_tools",
+    "GitCommitTool": "aol_fire.tools.git_tools",
+    "GitDiffTool": "aol_fire.tools.git_tools",
+    "AnalyzeProjectTool": "aol_fire.tools.project_tools",
+}
+
+
+# Which tools each capability flag enables, in the order they're offered
+# to the model (None = always available)
+_TOOL_TABLE = (
+    (None, ("ReadFileTool", "ListDirectoryTool", "SearchFilesTool")),
+    ("allow_file_writes", ("WriteFileTool", "EditFileTool", "CreateDirectoryTool", "MovePathTool")),
+    ("allow_file_deletes", ("DeletePathTool",)),
+    ("allow_shell_commands", ("ExecuteCommandTool", "BackgroundCommandTool")),
+    ("allow_web_search", ("WebSearchTool", "FetchURLTool")),
+    ("allow_code_execution", ("AnalyzeCodeTool", "RunPythonTool")),
+    (None, ("GitStatusTool", "GitDiffTool")),
+    ("allow_file_writes", ("GitCommitTool",)),
+    (None, ("AnalyzeProjectTool",)),
+)
+
+# Tools that don't operate on the workspace
+_WORKSPACE_FREE_TOOLS = frozenset({"WebSearchTool", "FetchURLTool"})
+
+
+def _load_tool_class(name: str) -> Any:
+    """Import a tool class by name and cache it in the module globals."""
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _load_tool_class(name)
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
+
+def _tool_kwargs(name: str, config: FireConfig) -> Dict[str, Any]:
+    """Constructor arguments for a tool."""
+    if name in _WORKSPACE_FREE_TOOLS:
+        return {}
+    kwargs: Dict[str, Any] = {"workspace_dir": config.workspace_dir}
+    if name == "ExecuteCommandTool":
+        kwargs["blocked_commands"] = config.blocked_commands
+    return kwargs
 
 
 def create_all_tools(config: FireConfig) -> List[BaseTool]:
     """Create all available tools based on configuration."""
-    workspace = config.workspace_dir
-    workspace.mkdir(parents=True, exist_ok=True)
+    config.workspace_dir.mkdir(parents=True, exist_ok=True)
     
     tools = []
-    
-    # File tools (always available)
-    tools.extend([
-        ReadFileTool(workspace_dir=workspace),
-        ListDirectoryTool(workspace_dir=workspace),
-        SearchFilesTool(workspace_dir=workspace),
-    ])
-    
-    # Write tools (if enabled)
-    if config.allow_file_writes:
-        tools.extend([
-            WriteFileTool(workspace_dir=workspace),
-            EditFileTool(workspace_dir=workspace),
-            CreateDirectoryTool(workspace_dir=workspace),
-            MovePathTool(workspace_dir=workspace),
-        ])
-    
-    if config.allow_file_deletes:
-        tools.append(DeletePathTool(workspace_dir=workspace))
-    
-    # Shell tools (if enabled)
-    if config.allow_shell_commands:
-        tools.extend([
-            ExecuteCommandTool(
-                workspace_dir=workspace,
-                blocked_commands=config.blocked_commands,
-            ),
-            BackgroundCommandTool(workspace_dir=workspace),
-        ])
-    
-    # Web tools (if enabled)
-    if config.allow_web_search:
-        tools.extend([
-            WebSearchTool(),
-            FetchURLTool(),
-        ])
-    
-    # Code tools (if enabled)
-    if config.allow_code_execution:
-        tools.extend([
-            AnalyzeCodeTool(workspace_dir=workspace),
-            RunPythonTool(workspace_dir=workspace),
-        ])
-    
-    # Git tools (always available)
-    tools.extend([
-        GitStatusTool(workspace_dir=workspace),
-        GitDiffTool(workspace_dir=workspace),
-    ])
-    
-    if config.allow_file_writes:
-        tools.append(GitCommitTool(workspace_dir=workspace))
-    
-    # Project tools
-    tools.append(AnalyzeProjectTool(workspace_dir=workspace))
+    for flag, names in _TOOL_TABLE:
+        if flag is None or getattr(config, flag):
+            for name in names:
+                cls = globals().get(name) or _load_tool_class(name)
+                tools.append(cls(**_tool_kwargs(name, config)))
     
     return tools
 
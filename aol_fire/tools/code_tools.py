@@ -12,15 +12,32 @@ Provides intelligent code analysis:
 from __future__ import annotations
 
 import ast
+import contextlib
+import functools
+import itertools
+import multiprocessing
+import os
+import re
+import subprocess
 import sys
+import threading
 import traceback
+import types
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import StringIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Pattern, Tuple, Type
 
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
 
 # =============================================================================
 # Input Schemas
@@ -36,7 +53,180 @@ class AnalyzeCodeInput(BaseModel):
 class RunPythonInput(BaseModel):
     """Input for running Python code."""
     code: str = Field(..., description="Python code to execute")
-    timeout: int = Field(default=30, description="Execution timeout in seconds")
+    timeout: int = Field(default=30, description="Execution timeout in seconds (0 runs inline, without a limit)")
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+# Directories never worth analyzing (vendored code, caches, VCS data)
+SKIP_DIRS = frozenset({
+    "node_modules", ".git", "__pycache__", "venv", ".venv",
+    "target", "build", "dist", ".pytest_cache", ".mypy_cache",
+})
+
+# Files analyzed per call
+MAX_ANALYZED_FILES = 10
+
+# Report icons: complexity buckets (<=5, <=10, above) and issue severities
+COMPLEXITY_ICONS = ("🟢", "🟡", "🔴")
+SEVERITY_ICONS = {"error": "🔴", "warning": "🟡"}
+DEFAULT_SEVERITY_ICON = "ℹ️"
+
+# Fields holding nested statement blocks, in ast field order
+_BLOCK_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+
+def _iter_statements(tree: ast.AST) -> Iterator[ast.AST]:
+    """
+    Breadth-first walk over statements only (plus except handlers and
+    match cases), in the same order ast.walk would yield them.
+    
+    Everything the analyzer extracts is a statement, so skipping the
+    expression subtrees avoids visiting most of the tree.
+    """
+    todo = deque([tree])
+    while todo:
+        node = todo.popleft()
+        yield node
+        for field in _BLOCK_FIELDS:
+            todo.extend(getattr(node, field, ()))
+
+
+def _raw_docstring(node: ast.AST) -> Optional[str]:
+    """
+    Docstring literal of a function or class, as written.
+    
+    Unlike ast.get_docstring this skips inspect.cleandoc; the report
+    never shows docstrings, so dedenting them would be wasted work.
+    """
+    body = getattr(node, "body", None)
+    if body and isinstance(body[0], ast.Expr):
+        value = body[0].value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            return value.value
+    return None
+
+
+# Scopes excluded from the enclosing function's complexity
+_NESTED_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+# Parsing is CPU-bound and holds the GIL, so large multi-file analyses run
+# in worker processes. Starting the pool costs close to a second (forkserver
+# plus re-importing this package) and serial parsing runs at roughly 1-2 MB/s,
+# so less source than this finishes sooner in-process
+MAX_ANALYSIS_WORKERS = min(8, os.cpu_count() or 1)
+PARALLEL_ANALYSIS_MIN_FILES = 3
+PARALLEL_ANALYSIS_MIN_BYTES = 2 * 1024 * 1024
+
+# The pool is usually started from a tool worker thread while other
+# threads hold locks, so workers must not be forked from this process
+POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Lazily create the process pool shared by all analyses."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=MAX_ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context(POOL_START_METHOD),
+            )
+        return _process_pool
+
+
+# Analyses of unchanged files, keyed by (path, mtime_ns, size), most recent last
+ANALYSIS_CACHE_SIZE = 512
+_analysis_cache: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+
+def _analysis_key(filepath: Path) -> Optional[Tuple[str, int, int]]:
+    try:
+        st = filepath.stat()
+    except OSError:
+        return None
+    return (str(filepath), st.st_mtime_ns, st.st_size)
+
+
+def _reset_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+# Address-space cap for run_python subprocesses
+RUN_PYTHON_MEMORY_BYTES = 1024 * 1024 * 1024
+
+
+# Runs inside the run_python child: caps its CPU time and memory, then runs
+# the snippet like `python -c` would. Limits are set by the child itself,
+# since preexec_fn isn't safe in a process with threads.
+# argv: cpu seconds, memory bytes, code
+_LIMITED_RUNNER = """\
+import resource as _r, sys as _s
+for _k, _v in ((_r.RLIMIT_CPU, int(_s.argv[1])), (_r.RLIMIT_AS, int(_s.argv[2]))):
+    _h = _r.getrlimit(_k)[1]
+    _r.setrlimit(_k, (_v if _h == _r.RLIM_INFINITY else min(_v, _h), _h))
+_c = _s.argv[3]
+_s.argv[:] = ["-c"]
+del _r, _s, _k, _v, _h
+exec(compile(globals().pop("_c"), "<string>", "exec"))
+"""
+
+
+def _python_command(code: str, cpu_seconds: int) -> List[str]:
+    """Command running code in a fresh interpreter, with rlimits where supported."""
+    if resource is None:
+        return [sys.executable, "-c", code]
+    return [
+        sys.executable, "-c", _LIMITED_RUNNER,
+        str(cpu_seconds), str(RUN_PYTHON_MEMORY_BYTES), code,
+    ]
+
+
+# sys.stdout/sys.stderr are process-wide, so only one snippet may capture
+# them at a time; the capture buffers are reused between runs
+_exec_lock = threading.Lock()
+_stdout_buf = StringIO()
+_stderr_buf = StringIO()
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_snippet(code: str) -> types.CodeType:
+    """Compile run_python source once per distinct snippet."""
+    return compile(code, "<run_python>", "exec")
+
+
+@functools.lru_cache(maxsize=None)
+def _todo_re() -> Pattern:
+    """Marker regex for TODO-style strings, compiled on first use."""
+    return re.compile(r"\b(?:TODO|FIXME|XXX|HACK)\b")
+
+
+def _iter_py_files(root: Path, skip: FrozenSet[str] = SKIP_DIRS) -> Iterator[Path]:
+    """Yield Python files under root lazily, pruning skipped directories."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip:
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        yield Path(entry.path)
+        except OSError:
+            continue
 
 
 # =============================================================================
@@ -78,10 +268,12 @@ Use this to understand code structure and identify improvements."""
     
     def _analyze_python(self, filepath: Path) -> Dict[str, Any]:
         """Analyze a Python file."""
-        content = filepath.read_text()
+        # Parsed as bytes: ast honors the PEP 263 coding cookie and no
+        # decoded copy of the file is kept around
+        data = filepath.read_bytes()
         
         try:
-            tree = ast.parse(content)
+            tree = ast.parse(data, filename=str(filepath))
         except SyntaxError as e:
             return {"error": f"Syntax error: {e}"}
         
@@ -93,18 +285,40 @@ Use this to understand code structure and identify improvements."""
             "metrics": {},
         }
         
-        # Extract functions
-        for node in ast.walk(tree):
+        # Extract structure and detect issues in one pass over the tree
+        issues = analysis["issues"]
+        todo_search = _todo_re().search
+        for node in _iter_statements(tree):
             if isinstance(node, ast.FunctionDef):
+                complexity = self._calculate_complexity(node)
                 func_info = {
                     "name": node.name,
                     "line": node.lineno,
                     "args": [arg.arg for arg in node.args.args],
                     "decorators": [self._get_decorator_name(d) for d in node.decorator_list],
-                    "docstring": ast.get_docstring(node),
-                    "complexity": self._calculate_complexity(node),
+                    "docstring": _raw_docstring(node),
+                    "complexity": complexity,
                 }
                 analysis["functions"].append(func_info)
+                
+                # Mutable default argument
+                for default in node.args.defaults:
+                    if isinstance(default, (ast.List, ast.Dict, ast.Set)):
+                        issues.append({
+                            "type": "mutable_default",
+                            "line": node.lineno,
+                            "message": f"Mutable default argument in {node.name}()",
+                            "severity": "warning",
+                        })
+                
+                # High complexity
+                if complexity > 10:
+                    issues.append({
+                        "type": "high_complexity",
+                        "line": node.lineno,
+                        "message": f"Function '{node.name}' has high complexity ({complexity})",
+                        "severity": "warning",
+                    })
             
             elif isinstance(node, ast.ClassDef):
                 methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
@@ -113,7 +327,7 @@ Use this to understand code structure and identify improvements."""
                     "line": node.lineno,
                     "methods": methods,
                     "bases": [self._get_name(b) for b in node.bases],
-                    "docstring": ast.get_docstring(node),
+                    "docstring": _raw_docstring(node),
                 }
                 analysis["classes"].append(class_info)
             
@@ -125,17 +339,44 @@ Use this to understand code structure and identify improvements."""
                 module = node.module or ""
                 for alias in node.names:
                     analysis["imports"].append(f"{module}.{alias.name}")
-        
-        # Detect issues
-        analysis["issues"] = self._detect_issues(tree, content)
+            
+            # Bare except
+            elif isinstance(node, ast.ExceptHandler):
+                if node.type is None:
+                    issues.append({
+                        "type": "bare_except",
+                        "line": node.lineno,
+                        "message": "Bare 'except:' clause catches all exceptions",
+                        "severity": "warning",
+                    })
+            
+            # TODO/FIXME comments
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+                if isinstance(node.value.value, str):
+                    if todo_search(node.value.value):
+                        issues.append({
+                            "type": "todo",
+                            "line": node.lineno,
+                            "message": node.value.value[:100],
+                            "severity": "info",
+                        })
         
         # Calculate metrics
-        lines = content.splitlines()
+        total_lines = code_lines = comment_lines = blank_lines = 0
+        for line in data.splitlines():
+            total_lines += 1
+            stripped = line.strip()
+            if not stripped:
+                blank_lines += 1
+            elif stripped[0] == 0x23:  # "#"
+                comment_lines += 1
+            else:
+                code_lines += 1
         analysis["metrics"] = {
-            "total_lines": len(lines),
-            "code_lines": len([l for l in lines if l.strip() and not l.strip().startswith('#')]),
-            "comment_lines": len([l for l in lines if l.strip().startswith('#')]),
-            "blank_lines": len([l for l in lines if not l.strip()]),
+            "total_lines": total_lines,
+            "code_lines": code_lines,
+            "comment_lines": comment_lines,
+            "blank_lines": blank_lines,
             "functions_count": len(analysis["functions"]),
             "classes_count": len(analysis["classes"]),
             "avg_complexity": sum(f["complexity"] for f in analysis["functions"]) / max(len(analysis["functions"]), 1),
@@ -143,6 +384,46 @@ Use this to understand code structure and identify improvements."""
         
         return analysis
     
+    def _analyze_files(self, files: List[Path]) -> Dict[Path, Dict[str, Any]]:
+        """
+        Analyze Python files, in worker processes when there is enough source.
+        
+        Files unchanged since their last analysis (same mtime and size) are
+        served from a shared cache; the returned dicts must not be modified.
+        """
+        analyses: Dict[Path, Dict[str, Any]] = {}
+        keys = {f: _analysis_key(f) for f in files}
+        with _analysis_cache_lock:
+            for f, key in keys.items():
+                if key in _analysis_cache:
+                    _analysis_cache.move_to_end(key)
+                    analyses[f] = _analysis_cache[key]
+        
+        todo = [f for f in files if f not in analyses]
+        todo_bytes = sum(keys[f][2] for f in todo if keys[f] is not None)
+        results = None
+        if (
+            MAX_ANALYSIS_WORKERS > 1
+            and len(todo) >= PARALLEL_ANALYSIS_MIN_FILES
+            and todo_bytes >= PARALLEL_ANALYSIS_MIN_BYTES
+        ):
+            try:
+                results = list(_get_process_pool().map(_analyze_python_worker, [str(f) for f in todo]))
+            except BrokenProcessPool:
+                _reset_process_pool()
+        if results is None:
+            results = [self._analyze_python(f) for f in todo]
+        
+        with _analysis_cache_lock:
+            for f, analysis in zip(todo, results):
+                analyses[f] = analysis
+                if keys[f] is not None:
+                    _analysis_cache[keys[f]] = analysis
+            while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+                _analysis_cache.popitem(last=False)
+        
+        return analyses
+    
     def _get_decorator_name(self, node) -> str:
         if isinstance(node, ast.Name):
             return node.id
@@ -160,68 +441,27 @@ Use this to understand code structure and identify improvements."""
         return str(node)
     
     def _calculate_complexity(self, node: ast.FunctionDef) -> int:
-        """Calculate cyclomatic complexity."""
-        complexity = 1
+        """
+        Calculate cyclomatic complexity.
         
-        for child in ast.walk(node):
+        Nested functions and lambdas are scored on their own, so the walk
+        stops at them; each node is visited once per file overall.
+        """
+        complexity = 1
+        stack = list(ast.iter_child_nodes(node))
+        while stack:
+            child = stack.pop()
+            if isinstance(child, _NESTED_SCOPES):
+                continue
+            
             if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
                 complexity += 1
             elif isinstance(child, ast.BoolOp):
                 complexity += len(child.values) - 1
-            elif isinstance(child, (ast.And, ast.Or)):
-                complexity += 1
+            stack.extend(ast.iter_child_nodes(child))
         
         return complexity
     
-    def _detect_issues(self, tree: ast.AST, content: str) -> List[Dict[str, Any]]:
-        """Detect potential code issues."""
-        issues = []
-        
-        for node in ast.walk(tree):
-            # Bare except
-            if isinstance(node, ast.ExceptHandler) and node.type is None:
-                issues.append({
-                    "type": "bare_except",
-                    "line": node.lineno,
-                    "message": "Bare 'except:' clause catches all exceptions",
-                    "severity": "warning",
-                })
-            
-            # Mutable default argument
-            if isinstance(node, ast.FunctionDef):
-                for default in node.args.defaults:
-                    if isinstance(default, (ast.List, ast.Dict, ast.Set)):
-                        issues.append({
-                            "type": "mutable_default",
-                            "line": node.lineno,
-                            "message": f"Mutable default argument in {node.name}()",
-                            "severity": "warning",
-                        })
-            
-            # TODO/FIXME comments
-            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
-                if isinstance(node.value.value, str):
-                    if "TODO" in node.value.value or "FIXME" in node.value.value:
-                        issues.append({
-                            "type": "todo",
-                            "line": node.lineno,
-                            "message": node.value.value[:100],
-                            "severity": "info",
-                        })
-            
-            # High complexity
-            if isinstance(node, ast.FunctionDef):
-                complexity = self._calculate_complexity(node)
-                if complexity > 10:
-                    issues.append({
-                        "type": "high_complexity",
-                        "line": node.lineno,
-                        "message": f"Function '{node.name}' has high complexity ({complexity})",
-                        "severity": "warning",
-                    })
-        
-        return issues
-    
     def _run(
         self,
         path: str,
@@ -236,57 +476,68 @@ Use this to understand code structure and identify improvements."""
             
             # Analyze single file or directory
             if resolved.is_file():
-                files = [resolved]
+                if resolved.suffix != ".py":
+                    return f"Error: Not a Python file: {path}"
+                found = iter([resolved])
             else:
-                files = list(resolved.rglob("*.py"))
+                found = _iter_py_files(resolved)
+            files = list(itertools.islice(found, MAX_ANALYZED_FILES))
             
             if not files:
                 return f"No Python files found in: {path}"
             
             output = [f"🔬 Code Analysis: {path}\n"]
             
-            for filepath in files[:10]:  # Limit to 10 files
-                rel_path = filepath.relative_to(self.workspace_dir) if filepath.is_relative_to(self.workspace_dir) else filepath
+            analyses = self._analyze_files(files)
+            
+            # Files found under the workspace start with its path, so a
+            # string prefix check stands in for is_relative_to/relative_to
+            ws_prefix = os.path.join(str(self.workspace_dir), "")
+            
+            for filepath in files:
+                rel_path = str(filepath)
+                if rel_path.startswith(ws_prefix):
+                    rel_path = rel_path[len(ws_prefix):]
                 output.append(f"\n📄 **{rel_path}**")
                 
-                if filepath.suffix == ".py":
-                    analysis = self._analyze_python(filepath)
-                    
-                    if "error" in analysis:
-                        output.append(f"   ❌ {analysis['error']}")
-                        continue
-                    
-                    # Functions
-                    if analysis["functions"]:
-                        output.append(f"\n   Functions ({len(analysis['functions'])}):")
-                        for func in analysis["functions"][:5]:
-                            complexity_indicator = "🟢" if func["complexity"] <= 5 else "🟡" if func["complexity"] <= 10 else "🔴"
-                            output.append(f"   {complexity_indicator} {func['name']}() - line {func['line']}, complexity {func['complexity']}")
-                    
-                    # Classes
-                    if analysis["classes"]:
-                        output.append(f"\n   Classes ({len(analysis['classes'])}):")
-                        for cls in analysis["classes"][:5]:
-                            output.append(f"   📦 {cls['name']} - {len(cls['methods'])} methods")
-                    
-                    # Metrics
-                    if include_metrics and analysis["metrics"]:
-                        m = analysis["metrics"]
-                        output.append(f"\n   Metrics:")
-                        output.append(f"   • Lines: {m['total_lines']} ({m['code_lines']} code, {m['comment_lines']} comments)")
-                        output.append(f"   • Avg complexity: {m['avg_complexity']:.1f}")
-                    
-                    # Issues
-                    if include_issues and analysis["issues"]:
-                        output.append(f"\n   Issues ({len(analysis['issues'])}):")
-                        for issue in analysis["issues"][:5]:
-                            icon = "🔴" if issue["severity"] == "error" else "🟡" if issue["severity"] == "warning" else "ℹ️"
-                            output.append(f"   {icon} Line {issue['line']}: {issue['message'][:60]}")
-                else:
-                    output.append(f"   (non-Python file)")
+                analysis = analyses[filepath]
+                
+                if "error" in analysis:
+                    output.append(f"   ❌ {analysis['error']}")
+                    continue
+                
+                # Functions
+                if analysis["functions"]:
+                    output.append(f"\n   Functions ({len(analysis['functions'])}):")
+                    for func in analysis["functions"][:5]:
+                        complexity = func["complexity"]
+                        icon = COMPLEXITY_ICONS[min((complexity - 1) // 5, 2)]
+                        output.append(f"   {icon} {func['name']}() - line {func['line']}, complexity {complexity}")
+                
+                # Classes
+                if analysis["classes"]:
+                    output.append(f"\n   Classes ({len(analysis['classes'])}):")
+                    for cls in analysis["classes"][:5]:
+                        output.append(f"   📦 {cls['name']} - {len(cls['methods'])} methods")
+                
+                # Metrics
+                if include_metrics and analysis["metrics"]:
+                    m = analysis["metrics"]
+                    output.append(f"\n   Metrics:")
+                    output.append(f"   • Lines: {m['total_lines']} ({m['code_lines']} code, {m['comment_lines']} comments)")
+                    output.append(f"   • Avg complexity: {m['avg_complexity']:.1f}")
+                
+                # Issues
+                if include_issues and analysis["issues"]:
+                    output.append(f"\n   Issues ({len(analysis['issues'])}):")
+                    for issue in analysis["issues"][:5]:
+                        icon = SEVERITY_ICONS.get(issue["severity"], DEFAULT_SEVERITY_ICON)
+                        output.append(f"   {icon} Line {issue['line']}: {issue['message'][:60]}")
             
-            if len(files) > 10:
-                output.append(f"\n... and {len(files) - 10} more files")
+            # Count the rest without building a list of them
+            remaining = sum(1 for _ in found)
+            if remaining:
+                output.append(f"\n... and {remaining} more files")
             
             return "\n".join(output)
             
@@ -294,6 +545,11 @@ Use this to understand code structure and identify improvements."""
             return f"❌ Analysis error: {str(e)}"
 
 
+def _analyze_python_worker(path: str) -> Dict[str, Any]:
+    """Process-pool entry point: analyze one Python file."""
+    return AnalyzeCodeTool()._analyze_python(Path(path))
+
+
 class RunPythonTool(BaseTool):
     """
     Safely execute Python code.
@@ -324,45 +580,73 @@ Code runs in an isolated environment with captured output."""
         code: str,
         timeout: int = 30,
     ) -> str:
+        if timeout <= 0:
+            return self._run_inline(code)
+        
+        try:
+            # A separate interpreter, so the timeout can be enforced and the
+            # snippet can't touch the agent's memory or module state
+            result = subprocess.run(
+                _python_command(code, timeout),
+                cwd=self.workspace_dir,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return f"⏰ Code timed out after {timeout} seconds"
+        except Exception as e:
+            return f"❌ Error running code: {str(e)}"
+        
+        if result.returncode != 0:
+            output = []
+            if result.stdout:
+                output.append(f"📤 Output:\n{result.stdout}")
+            output.append(f"❌ Execution error (exit code {result.returncode}):\n{result.stderr}")
+            return "\n".join(output)
+        
+        return self._format_output(result.stdout, result.stderr)
+    
+    def _run_inline(self, code: str) -> str:
+        """Execute code in this process (no timeout or resource limits)."""
         try:
-            # Capture stdout and stderr
-            old_stdout = sys.stdout
-            old_stderr = sys.stderr
-            sys.stdout = StringIO()
-            sys.stderr = StringIO()
-            
             # Create isolated globals
             exec_globals = {
                 "__builtins__": __builtins__,
                 "__name__": "__main__",
             }
             
-            try:
-                # Execute code
-                exec(code, exec_globals)
+            with _exec_lock:
+                for buf in (_stdout_buf, _stderr_buf):
+                    buf.seek(0)
+                    buf.truncate(0)
                 
-                stdout_val = sys.stdout.getvalue()
-                stderr_val = sys.stderr.getvalue()
+                # Execute code, capturing stdout and stderr
+                with contextlib.redirect_stdout(_stdout_buf), contextlib.redirect_stderr(_stderr_buf):
+                    exec(_compile_snippet(code), exec_globals)
                 
-            finally:
-                sys.stdout = old_stdout
-                sys.stderr = old_stderr
-            
-            output = []
+                stdout_val = _stdout_buf.getvalue()
+                stderr_val = _stderr_buf.getvalue()
             
-            if stdout_val:
-                output.append(f"📤 Output:\n{stdout_val}")
-            
-            if stderr_val:
-                output.append(f"⚠️ Stderr:\n{stderr_val}")
-            
-            if not output:
-                output.append("✓ Code executed successfully (no output)")
-            
-            return "\n".join(output)
+            return self._format_output(stdout_val, stderr_val)
             
         except SyntaxError as e:
             return f"❌ Syntax error: {e}"
         except Exception as e:
             tb = traceback.format_exc()
             return f"❌ Execution error:\n{tb}"
+    
+    @staticmethod
+    def _format_output(stdout_val: str, stderr_val: str) -> str:
+        output = []
+        
+        if stdout_val:
+            output.append(f"📤 Output:\n{stdout_val}")
+        
+        if stderr_val:
+            output.append(f"⚠️ Stderr:\n{stderr_val}")
+        
+        if not output:
+            output.append("✓ Code executed successfully (no output)")
+        
+        return "\n".join(output)
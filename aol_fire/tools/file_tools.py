@@ -10,17 +10,35 @@ Provides secure, audited file operations with:
 
 from __future__ import annotations
 
+import fnmatch
+import functools
 import hashlib
+import itertools
 import os
 import re
 import shutil
-from datetime import datetime
+import stat
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Deque, Dict, Iterator, List, Optional, Pattern, Tuple, Type
 
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+try:
+    import pathspec
+except ImportError:  # pragma: no cover - pathspec is optional
+    pathspec = None
+
 
 # =============================================================================
 # Input Schemas
@@ -87,6 +105,261 @@ class MovePathInput(BaseModel):
     overwrite: bool = Field(default=False, description="Overwrite if exists")
 
 
+# =============================================================================
+# Helpers
+# =============================================================================
+
+# Anchors and lookarounds that behave differently on a single line than on
+# the whole file; patterns using them are matched line by line only
+_LINE_CONTEXT_RE = re.compile(r"\\[AZbB]|\(\?<?[=!]")
+
+# Line breaks str.splitlines() knows in ASCII text, other than "\n"
+_OTHER_LINE_BREAKS = re.compile(rb"[\r\x0b\x0c\x1c-\x1e]")
+
+# Characters that end the literal start of a pattern
+_REGEX_META = frozenset(".^$*+?{}[]()\\|")
+
+# Bytes checked for NUL when deciding whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+
+# search_files threads spend most of their time reading and decoding files
+MAX_SEARCH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    """Lazily create the thread pool shared by all searches."""
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            _search_pool = ThreadPoolExecutor(
+                max_workers=MAX_SEARCH_WORKERS,
+                thread_name_prefix="fire-search",
+            )
+        return _search_pool
+
+
+# Files search_files has queued or in flight at once
+SEARCH_WINDOW = MAX_SEARCH_WORKERS * 2
+
+
+def _search_map(fn: Any, items: Iterator[Path], window: int = SEARCH_WINDOW) -> Iterator[List[str]]:
+    """
+    Like Executor.map on the search pool, but pulls items lazily and
+    keeps at most window calls queued. Closing the generator early
+    cancels the calls that haven't started.
+    """
+    pool = _get_search_pool()
+    pending: Deque[Future] = deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Return the lowercased literal text every match of pattern starts with.
+    
+    Only plain ASCII characters count, so the prefix can be found with
+    str.find in lowercased ASCII text. Returns "" when there is none (or
+    the pattern has an alternation, which makes any prefix optional).
+    """
+    if "|" in pattern:
+        return ""
+    end = 0
+    for ch in pattern:
+        if ch in _REGEX_META:
+            # A ?, * or {0,n} quantifier makes the previous character optional
+            if ch in "?*{":
+                end = max(0, end - 1)
+            break
+        if not ch.isascii() or ch == "\n":
+            break
+        end += 1
+    return pattern[:end].lower()
+
+
+def _candidate_lines(text: str, literal: str) -> Iterator[int]:
+    """Yield the indexes of the lines of text that contain literal, via str.find."""
+    line = 0
+    line_start = 0
+    pos = text.find(literal)
+    while pos != -1:
+        line += text.count("\n", line_start, pos)
+        yield line
+        line_end = text.find("\n", pos)
+        if line_end == -1:
+            return
+        line += 1
+        line_start = line_end + 1
+        pos = text.find(literal, line_start)
+
+
+# ioctl that makes a copy-on-write clone of a file (btrfs, XFS, ...)
+FICLONE = 0x40049409 if fcntl is not None and sys.platform.startswith("linux") else None
+
+
+@functools.lru_cache(maxsize=1)
+def _backup_timestamp(seconds: int) -> str:
+    """Local-time stamp for backup names; formatted once per second."""
+    return time.strftime("%Y%m%d_%H%M%S", time.localtime(seconds))
+
+
+def _backup(src: Path, dst: Path, link: bool = False) -> None:
+    """
+    Copy src to dst as cheaply as the filesystem allows.
+    
+    Tries a hard link (only with link=True, for callers that replace src
+    afterwards instead of rewriting it), then a reflink clone, and falls
+    back to shutil.copy2.
+    """
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    
+    if FICLONE is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    
+    shutil.copy2(src, dst)
+
+
+def _stat(path: Path) -> Optional[os.stat_result]:
+    """
+    Stat path once (following symlinks), or return None if it can't be.
+    
+    Replaces exists()/is_file()/stat() chains, which each stat again.
+    """
+    try:
+        return path.stat()
+    except (OSError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_glob(pattern: str) -> Pattern[str]:
+    """Compile a glob without "/" into a regex that matches whole file names."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+# Tree drawing for list_directory
+TREE_BRANCH = "├── "
+TREE_LAST = "└── "
+TREE_PIPE = "│   "
+TREE_SPACE = "    "
+
+# Directories search_files never descends into, .gitignore or not
+SEARCH_SKIP_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__", "venv", ".venv",
+})
+
+# (chars to strip from the root-relative path, prefix to add, spec): turns
+# a path relative to the search root into one relative to the .gitignore.
+# Rule lists run from the shallowest .gitignore to the deepest.
+IgnoreRule = Tuple[int, str, Any]
+
+
+def _load_gitignore(path: str) -> Optional[Any]:
+    """Parse a .gitignore file, or return None if it can't be used."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return pathspec.GitIgnoreSpec.from_lines(f.read().splitlines())
+    except (OSError, ValueError):
+        return None
+
+
+def _ancestor_gitignores(root: Path) -> List[IgnoreRule]:
+    """
+    Collect .gitignore rules from directories above root, up to the
+    enclosing repository's top level. Outside a repository there are none.
+    """
+    root_abs = Path(os.path.abspath(root))
+    rules = []
+    for ancestor in root_abs.parents:
+        gitignore = ancestor / ".gitignore"
+        if gitignore.is_file():
+            spec = _load_gitignore(str(gitignore))
+            if spec is not None:
+                rules.append((0, root_abs.relative_to(ancestor).as_posix() + "/", spec))
+        if (ancestor / ".git").exists():
+            rules.reverse()
+            return rules
+    return []
+
+
+def _is_ignored(rules: List[IgnoreRule], rel: str) -> bool:
+    """
+    Apply .gitignore rules the way git does: the deepest file with a
+    matching pattern decides, and within it the last match wins (so a
+    "!" pattern can re-include what a parent directory's file ignored).
+    """
+    for strip, prefix, spec in reversed(rules):
+        include = spec.check_file(prefix + rel[strip:]).include
+        if include is not None:
+            return include
+    return False
+
+
+def _iter_search_files(root: Path, name_re: Optional[Pattern[str]] = None) -> Iterator[Path]:
+    """
+    Yield the files under root that search_files should look at.
+    
+    Walks with os.scandir in the same order rglob would, pruning
+    SEARCH_SKIP_DIRS and anything matched by a .gitignore (when pathspec
+    is installed) before descending. name_re, if given, must match the
+    whole file name.
+    """
+    use_gitignore = pathspec is not None
+    rules = _ancestor_gitignores(root) if use_gitignore else []
+    # (directory, its path relative to root with a trailing "/", rules)
+    stack = [(str(root), "", rules)]
+    
+    while stack:
+        dirpath, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        
+        if use_gitignore:
+            for entry in entries:
+                if entry.name == ".gitignore" and entry.is_file():
+                    spec = _load_gitignore(entry.path)
+                    if spec is not None:
+                        rules = rules + [(len(rel_dir), "", spec)]
+                    break
+        
+        subdirs = []
+        for entry in entries:
+            rel = rel_dir + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SEARCH_SKIP_DIRS and not _is_ignored(rules, rel + "/"):
+                    subdirs.append((entry.path, rel + "/", rules))
+            elif (name_re is None or name_re.match(entry.name)) and not _is_ignored(rules, rel):
+                yield Path(entry.path)
+        
+        # Depth-first, subdirectories in listing order
+        stack.extend(reversed(subdirs))
+
+
 # =============================================================================
 # Tool Implementations
 # =============================================================================
@@ -128,34 +401,31 @@ Use this to examine code, configs, or any text file."""
     ) -> str:
         try:
             resolved = self._resolve_path(path)
+            st = _stat(resolved)
             
-            if not resolved.exists():
+            if st is None:
                 return f"Error: File not found: {path}"
             
-            if not resolved.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return f"Error: Not a file: {path}"
             
+            # Line range: decode only up to the last requested line
+            if start_line is not None or end_line is not None:
+                start = max((start_line or 1) - 1, 0)
+                with resolved.open("r", encoding=encoding) as f:
+                    lines = itertools.islice(f, start, end_line)
+                    
+                    # Add line numbers
+                    return "\n".join(
+                        f"{i:4d} | {line.rstrip()}" for i, line in enumerate(lines, start=start + 1)
+                    )
+            
             # Check file size
-            size = resolved.stat().st_size
+            size = st.st_size
             if size > 1_000_000:  # 1MB
                 return f"Warning: Large file ({size:,} bytes). Use start_line/end_line to read portions."
             
-            content = resolved.read_text(encoding=encoding)
-            lines = content.splitlines(keepends=True)
-            
-            # Apply line range if specified
-            if start_line is not None or end_line is not None:
-                start = (start_line or 1) - 1
-                end = end_line or len(lines)
-                lines = lines[start:end]
-                
-                # Add line numbers
-                result = []
-                for i, line in enumerate(lines, start=start + 1):
-                    result.append(f"{i:4d} | {line.rstrip()}")
-                return "\n".join(result)
-            
-            return content
+            return resolved.read_text(encoding=encoding)
             
         except UnicodeDecodeError:
             return f"Error: Cannot decode file with {encoding} encoding. Try a different encoding."
@@ -192,8 +462,8 @@ Use this to create new files or completely overwrite existing ones."""
             return p
         return self.workspace_dir / p
     
-    def _compute_hash(self, content: str) -> str:
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+    def _compute_hash(self, data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()[:16]
     
     def _run(
         self,
@@ -212,17 +482,25 @@ Use this to create new files or completely overwrite existing ones."""
             # Backup existing file
             backup_path = None
             if resolved.exists() and create_backup:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = _backup_timestamp(int(time.time()))
                 backup_path = resolved.with_suffix(f".{timestamp}.bak")
-                shutil.copy2(resolved, backup_path)
-            
-            # Atomic write
+                # The file is replaced rather than rewritten below, so a hard
+                # link keeps the old contents without copying them
+                _backup(resolved, backup_path, link=True)
+            
+            # Atomic write: flush the data to disk, then swap it in
+            # (os.replace also overwrites an existing target on Windows)
+            # The content is encoded once; the same bytes are written and hashed
+            data = content.encode("utf-8")
             temp_path = resolved.with_suffix(".tmp")
-            temp_path.write_text(content)
-            temp_path.rename(resolved)
+            with temp_path.open("wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, resolved)
             
             # Compute hash
-            content_hash = self._compute_hash(content)
+            content_hash = self._compute_hash(data)
             
             result = f"✓ Wrote {len(content):,} chars to {path}\n"
             result += f"  Hash: {content_hash}"
@@ -280,35 +558,32 @@ Use this for targeted modifications instead of rewriting entire files."""
             if old_text not in content:
                 return f"Error: Text not found in file:\n{old_text[:100]}..."
             
-            # Count occurrences
-            count = content.count(old_text)
-            
             # Replace
             if occurrence == 0:
                 # Replace all
                 new_content = content.replace(old_text, new_text)
-                replaced = count
+                replaced = content.count(old_text)
             else:
-                # Replace specific occurrence
-                parts = content.split(old_text)
-                if occurrence > len(parts) - 1:
+                # Replace specific occurrence: find() steps over the earlier
+                # (non-overlapping) ones, then two slices build the result
+                pos = -1
+                start = 0
+                for _ in range(occurrence):
+                    pos = content.find(old_text, start)
+                    if pos == -1:
+                        break
+                    start = pos + len(old_text)
+                if pos == -1:
+                    count = content.count(old_text)
                     return f"Error: Only {count} occurrences found, requested #{occurrence}"
                 
-                new_parts = []
-                for i, part in enumerate(parts[:-1]):
-                    new_parts.append(part)
-                    if i + 1 == occurrence:
-                        new_parts.append(new_text)
-                    else:
-                        new_parts.append(old_text)
-                new_parts.append(parts[-1])
-                new_content = "".join(new_parts)
+                new_content = content[:pos] + new_text + content[pos + len(old_text):]
                 replaced = 1
             
             # Backup and write
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = _backup_timestamp(int(time.time()))
             backup_path = resolved.with_suffix(f".{timestamp}.bak")
-            shutil.copy2(resolved, backup_path)
+            _backup(resolved, backup_path)
             
             resolved.write_text(new_content)
             
@@ -347,6 +622,107 @@ Use this to find code, references, or patterns across the codebase."""
             return p
         return self.workspace_dir / p
     
+    def _search_file(
+        self,
+        filepath: Path,
+        search: Any,
+        whole_file: bool,
+        context_lines: int,
+        limit: int,
+        literal: str = "",
+        bytes_search: Any = None,
+        workspace_prefix: str = "",
+    ) -> List[str]:
+        """
+        Search one file, returning up to limit formatted matches.
+        
+        literal is the pattern's lowercased literal prefix (see
+        _literal_prefix); in ASCII files only lines containing it are
+        handed to the regex. bytes_search is the same pattern compiled
+        for bytes (None if the pattern isn't ASCII), used to rule out
+        ASCII files before decoding them. workspace_prefix (the workspace
+        path plus a separator, "" for ".") is trimmed off displayed paths.
+        """
+        results: List[str] = []
+        if not filepath.is_file():
+            return results
+        
+        # Skip binary and large files. The file is opened unbuffered and
+        # read with exact sizes from fstat, so a typical source file takes
+        # a single read() syscall instead of a buffered read-until-EOF loop
+        try:
+            with filepath.open("rb", buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if size > 500_000:
+                    return results
+                
+                # A NUL byte near the start means binary (as ripgrep does it)
+                head = f.read(BINARY_SNIFF_BYTES)
+                if b"\x00" in head:
+                    return results
+                data = head + f.read(size - len(head)) if size > len(head) else head
+            
+            is_ascii = data.isascii()
+            first = None
+            
+            # Most files don't match; for ASCII ones that shows on the raw
+            # bytes, without decoding and splitting the file into lines
+            if is_ascii and literal:
+                # The find() loop below beats a whole-file regex scan
+                if literal.encode() not in data.lower():
+                    return results
+            elif (
+                is_ascii and whole_file and bytes_search is not None
+                and _OTHER_LINE_BREAKS.search(data) is None
+            ):
+                # Lines split only at "\n", so the raw bytes read like the
+                # joined lines below
+                match = bytes_search(data)
+                if match is None:
+                    return results
+                first = data.count(b"\n", 0, match.start())
+            
+            lines = data.decode("utf-8", errors="ignore").splitlines()
+            candidates = range(first or 0, len(lines))
+            
+            if literal and is_ascii:
+                # Every matching line contains the prefix, and ASCII
+                # lowercasing keeps offsets, so a find() loop picks out
+                # the few lines worth running the regex on
+                candidates = _candidate_lines("\n".join(lines).lower(), literal)
+            elif whole_file and first is None:
+                # One scan over the file skips files without a match and
+                # the lines before the first one; a line matching on its
+                # own always matches at the same spot in the joined text
+                joined = "\n".join(lines)
+                match = search(joined)
+                if match is None:
+                    return results
+                candidates = range(joined.count("\n", 0, match.start()), len(lines))
+            
+            rel_path = None
+            for i in candidates:
+                if search(lines[i]):
+                    # Get context
+                    start = max(0, i - context_lines)
+                    end = min(len(lines), i + context_lines + 1)
+                    context = "\n".join(
+                        f"{'>' if j == i else ' '} {j+1:4d} | {lines[j]}" for j in range(start, end)
+                    )
+                    
+                    if rel_path is None:
+                        rel_path = str(filepath)
+                        if rel_path.startswith(workspace_prefix):
+                            rel_path = rel_path[len(workspace_prefix):]
+                    results.append(f"📄 {rel_path}:\n" + context)
+                    
+                    if len(results) >= limit:
+                        break
+        except Exception:
+            pass
+        
+        return results
+    
     def _run(
         self,
         pattern: str,
@@ -357,52 +733,57 @@ Use this to find code, references, or patterns across the codebase."""
     ) -> str:
         try:
             resolved = self._resolve_path(path)
+            st = _stat(resolved)
             
-            if not resolved.exists():
+            if st is None:
                 return f"Error: Path not found: {path}"
             
-            regex = re.compile(pattern, re.IGNORECASE)
+            # MULTILINE only changes ^/$, which then also hold at line breaks
+            # when the whole file is searched at once
+            regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+            search = regex.search
+            whole_file = _LINE_CONTEXT_RE.search(pattern) is None
+            literal = _literal_prefix(pattern)
+            # Matches are shown relative to the workspace by trimming this
+            # prefix, like Path.relative_to but without parsing each path
+            workspace = str(self.workspace_dir)
+            workspace_prefix = "" if workspace == "." else os.path.join(workspace, "")
+            bytes_search = None
+            if pattern.isascii():
+                try:
+                    bytes_search = re.compile(pattern.encode(), re.IGNORECASE | re.MULTILINE).search
+                except re.error:
+                    pass
             results = []
             
-            # Get files to search
-            if resolved.is_file():
-                files = [resolved]
+            def search_one(filepath: Path) -> List[str]:
+                return self._search_file(
+                    filepath, search, whole_file, context_lines, max_results,
+                    literal, bytes_search, workspace_prefix,
+                )
+            
+            # Get files to search. Directory walks are lazy and files are
+            # scanned on the thread pool (mostly I/O and decoding) a window
+            # at a time, so hitting max_results stops both
+            if stat.S_ISREG(st.st_mode):
+                per_file = map(search_one, [resolved])
             else:
-                glob = file_pattern or "*"
-                files = list(resolved.rglob(glob))
-            
-            for filepath in files:
-                if not filepath.is_file():
-                    continue
-                
-                # Skip binary and large files
-                try:
-                    if filepath.stat().st_size > 500_000:
-                        continue
-                    
-                    content = filepath.read_text(errors='ignore')
-                    lines = content.splitlines()
-                    
-                    for i, line in enumerate(lines):
-                        if regex.search(line):
-                            # Get context
-                            start = max(0, i - context_lines)
-                            end = min(len(lines), i + context_lines + 1)
-                            
-                            context = []
-                            for j in range(start, end):
-                                prefix = ">" if j == i else " "
-                                context.append(f"{prefix} {j+1:4d} | {lines[j]}")
-                            
-                            rel_path = filepath.relative_to(self.workspace_dir) if filepath.is_relative_to(self.workspace_dir) else filepath
-                            results.append(f"📄 {rel_path}:\n" + "\n".join(context))
-                            
-                            if len(results) >= max_results:
-                                results.append(f"\n... truncated at {max_results} results")
-                                return "\n\n".join(results)
-                                
-                except Exception:
-                    continue
+                if file_pattern and "/" in file_pattern:
+                    # Path-style globs still go through pathlib
+                    files = resolved.rglob(file_pattern)
+                else:
+                    name_re = None
+                    if file_pattern and file_pattern != "*":
+                        name_re = _compile_glob(file_pattern)
+                    files = _iter_search_files(resolved, name_re)
+                per_file = _search_map(search_one, files)
+            
+            for hits in per_file:
+                for hit in hits:
+                    results.append(hit)
+                    if len(results) >= max_results:
+                        results.append(f"\n... truncated at {max_results} results")
+                        return "\n\n".join(results)
             
             if not results:
                 return f"No matches found for: {pattern}"
@@ -461,21 +842,29 @@ Use this to explore project structure and find files."""
     ) -> str:
         try:
             resolved = self._resolve_path(path)
+            st = _stat(resolved)
             
-            if not resolved.exists():
+            if st is None:
                 return f"Error: Directory not found: {path}"
             
-            if not resolved.is_dir():
+            if not stat.S_ISDIR(st.st_mode):
                 return f"Error: Not a directory: {path}"
             
             output = [f"📁 {resolved.name}/"]
             
-            def list_dir(dir_path: Path, prefix: str = "", depth: int = 0):
+            # Name-only globs are compiled once instead of being re-parsed
+            # by Path.match for every entry
+            name_re = _compile_glob(pattern) if pattern and "/" not in pattern else None
+            
+            # DirEntry objects carry the file type from the directory read
+            # itself, so sorting and filtering cost no extra stat calls
+            def list_dir(dir_path: str, prefix: str = "", depth: int = 0):
                 if depth > max_depth:
                     return
                 
                 try:
-                    items = sorted(dir_path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+                    with os.scandir(dir_path) as it:
+                        items = sorted(it, key=lambda x: (not x.is_dir(), x.name.lower()))
                 except PermissionError:
                     output.append(f"{prefix}⚠️  [Permission denied]")
                     return
@@ -485,23 +874,30 @@ Use this to explore project structure and find files."""
                     items = [i for i in items if not i.name.startswith('.')]
                 
                 # Filter by pattern
-                if pattern:
-                    items = [i for i in items if i.is_dir() or i.match(pattern)]
+                if name_re is not None:
+                    items = [i for i in items if i.is_dir() or name_re.match(i.name)]
+                elif pattern:
+                    items = [i for i in items if i.is_dir() or Path(i.path).match(pattern)]
+                
+                # Connectors and child prefixes are built once per directory
+                branch = prefix + TREE_BRANCH
+                child_prefix = prefix + TREE_PIPE
+                last = len(items) - 1
                 
                 for i, item in enumerate(items):
-                    is_last = i == len(items) - 1
-                    connector = "└── " if is_last else "├── "
+                    if i == last:
+                        branch = prefix + TREE_LAST
+                        child_prefix = prefix + TREE_SPACE
                     
                     if item.is_dir():
-                        output.append(f"{prefix}{connector}📁 {item.name}/")
+                        output.append(f"{branch}📁 {item.name}/")
                         if recursive:
-                            new_prefix = prefix + ("    " if is_last else "│   ")
-                            list_dir(item, new_prefix, depth + 1)
+                            list_dir(item.path, child_prefix, depth + 1)
                     else:
                         size = self._format_size(item.stat().st_size)
-                        output.append(f"{prefix}{connector}📄 {item.name} ({size})")
+                        output.append(f"{branch}📄 {item.name} ({size})")
             
-            list_dir(resolved)
+            list_dir(str(resolved))
             
             return "\n".join(output)
             
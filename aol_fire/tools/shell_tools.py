@@ -11,18 +11,60 @@ Provides secure shell command execution with:
 
 from __future__ import annotations
 
+import functools
 import os
+import re
 import subprocess
 import signal
 import shlex
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Type
 from datetime import datetime
 
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
 
+# =============================================================================
+# Command Blocklist
+# =============================================================================
+
+# Default dangerous patterns, always blocked
+DANGEROUS_PATTERNS = (
+    "rm -rf /",
+    "rm -rf /*",
+    "mkfs",
+    "dd if=/dev/zero",
+    "dd if=/dev/random",
+    ":(){:|:&};:",  # Fork bomb
+    "chmod -R 777 /",
+    "> /dev/sda",
+    "mv /* ",
+    "wget http",  # Potential for malicious downloads
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_blocklist(patterns: Tuple[str, ...]) -> Tuple[Optional[Pattern], Dict[str, str]]:
+    """
+    Compile blocklist patterns into one regex that scans a command once.
+    
+    Returns the regex (None if there are no patterns) and a map from the
+    lowercased match back to the pattern as it was configured.
+    """
+    originals: Dict[str, str] = {}
+    for pattern in patterns:
+        if pattern:
+            originals.setdefault(pattern.lower(), pattern)
+    
+    if not originals:
+        return None, originals
+    
+    # Longest first, so a pattern that extends another wins at the same position
+    alternatives = sorted(originals, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, alternatives))), originals
+
+
 # =============================================================================
 # Input Schemas
 # =============================================================================
@@ -84,27 +126,12 @@ Security: Some dangerous commands are blocked for safety."""
     
     def _is_blocked(self, command: str) -> Optional[str]:
         """Check if command is in blocklist."""
-        cmd_lower = command.lower()
-        
-        # Default dangerous patterns
-        dangerous = [
-            "rm -rf /",
-            "rm -rf /*",
-            "mkfs",
-            "dd if=/dev/zero",
-            "dd if=/dev/random",
-            ":(){:|:&};:",  # Fork bomb
-            "chmod -R 777 /",
-            "> /dev/sda",
-            "mv /* ",
-            "wget http",  # Potential for malicious downloads
-        ]
-        
-        for pattern in dangerous + self.blocked_commands:
-            if pattern.lower() in cmd_lower:
-                return pattern
+        regex, originals = _compile_blocklist(DANGEROUS_PATTERNS + tuple(self.blocked_commands))
+        if regex is None:
+            return None
         
-        return None
+        match = regex.search(command.lower())
+        return originals[match.group()] if match else None
     
     def _run(
         self,
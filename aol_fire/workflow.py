@@ -10,9 +10,11 @@ Implements a sophisticated multi-agent workflow with:
 
 from __future__ import annotations
 
+import threading
 import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Annotated, Sequence
+from typing import Any, Dict, List, Literal, Optional, Annotated, Sequence, Tuple
 import operator
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
@@ -24,6 +26,7 @@ from aol_fire.models import (
     AgentState,
     ExecutionMetrics,
     FileChange,
+    Memory,
     Plan,
     PlanStatus,
     Task,
@@ -33,7 +36,8 @@ from aol_fire.models import (
 from aol_fire.core import FireConfig
 from aol_fire.llm import create_chat_model
 from aol_fire.tools import create_all_tools
-from aol_fire.agents import OrchestratorAgent, PlannerAgent, CoderAgent
+from aol_fire.agents import OrchestratorAgent, PlannerAgent
+from aol_fire.agents.parsing import dumps_json
 
 
 # =============================================================================
@@ -45,6 +49,14 @@ class WorkflowState(Dict[str, Any]):
     pass
 
 
+# Only the most recent tool calls are kept; the report just needs the tail
+MAX_TRACKED_TOOL_CALLS = 500
+
+# Runs whose executor agents are kept at once per compiled graph; older
+# ones just get fresh agents if they come back
+MAX_ACTIVE_RUNS = 32
+
+
 # =============================================================================
 # Node Functions
 # =============================================================================
@@ -79,9 +91,9 @@ def create_planner_node(config: FireConfig):
         
         # Add message
         task_list = "\n".join(f"  {i+1}. {t.title}" for i, t in enumerate(plan.tasks))
-        state["messages"] = state.get("messages", []) + [
+        state.setdefault("messages", []).append(
             AIMessage(content=f"Created plan with {len(plan.tasks)} tasks:\n{task_list}")
-        ]
+        )
         
         return state
     
@@ -93,9 +105,33 @@ def create_executor_node(config: FireConfig, tools: List):
     
     tool_map = {t.name: t for t in tools}
     
+    # The compiled graph is shared by every agent with this config, but the
+    # orchestrator and coder hold per-run state (the prefetched prompt, the
+    # files-context memo), so each run gets its own. They are keyed by the
+    # id of the run's plan, which the planner creates once per run; the
+    # plan is kept alongside so its id can't be reused.
+    run_agents: "OrderedDict[int, Tuple[Plan, OrchestratorAgent]]" = OrderedDict()
+    run_agents_lock = threading.Lock()
+    
+    def orchestrator_for(plan: Plan) -> OrchestratorAgent:
+        key = id(plan)
+        with run_agents_lock:
+            entry = run_agents.get(key)
+            if entry is None:
+                entry = (plan, OrchestratorAgent(config, tools))
+                run_agents[key] = entry
+                while len(run_agents) > MAX_ACTIVE_RUNS:
+                    run_agents.popitem(last=False)
+            run_agents.move_to_end(key)
+            return entry[1]
+    
+    def finish_run(plan: Plan) -> None:
+        with run_agents_lock:
+            run_agents.pop(id(plan), None)
+    
     def executor_node(state: WorkflowState) -> WorkflowState:
         """
-        Execute the current task.
+        Execute the current task (or a batch of simple tasks).
         
         Uses tools to accomplish tasks and tracks results.
         """
@@ -104,51 +140,74 @@ def create_executor_node(config: FireConfig, tools: List):
             state["error"] = "No plan to execute"
             return state
         
-        # Get current task
-        current = plan.current_task
-        if not current:
+        # Shared across this run's iterations so the next task's prompt
+        # can be prefetched
+        orchestrator = orchestrator_for(plan)
+        coder = orchestrator.get_agent(AgentRole.CODER)
+        
+        # Get current task, plus any simple tasks that can share its LLM call
+        batch = orchestrator.next_task_batch(plan)
+        if not batch:
+            finish_run(plan)
             plan.status = PlanStatus.COMPLETED
             plan.completed_at = datetime.now()
             return state
         
-        # Mark task in progress
-        current.start()
-        
-        # Create coder agent with tools
-        coder = CoderAgent(config, tools)
+        # Mark tasks in progress
+        for task in batch:
+            task.start()
         
         # Build context
         context = {}
         if state.get("memory"):
             context["project_info"] = state["memory"].working_context
+            # Serialize once for the current task, prefetch and batch prompts
+            context["project_info_json"] = dumps_json(context["project_info"], indent=True)
         
-        # Execute task
-        start_time = time.time()
-        result = coder.execute_task(current, context)
-        duration_ms = int((time.time() - start_time) * 1000)
+        # Use the prompt prepared during the previous task, then start
+        # preparing the one for the task after this
+        current = batch[0]
+        prompt = orchestrator.take_prefetched_prompt(current)
+        upcoming = plan.current_task
+        if upcoming:
+            orchestrator.prefetch_task_prompt(coder, upcoming, context)
         
-        # Update task
-        if result.get("success"):
-            current.complete(result.get("output", "Completed"))
+        # Execute tasks
+        start_time = time.time()
+        if len(batch) > 1:
+            results = coder.batch_execute_tasks(batch, context)
         else:
-            current.fail(result.get("error", "Unknown error"))
+            results = [coder.execute_task(current, context, prompt=prompt)]
+        duration_ms = int((time.time() - start_time) * 1000)
         
-        # Track tool calls
-        for tc in result.get("tool_calls", []):
-            state.setdefault("tool_calls", []).append(tc)
+        # The run's agents aren't needed once no task is left
+        if plan.current_task is None:
+            finish_run(plan)
         
-        # Track file changes
-        for fc in result.get("file_changes", []):
-            state.setdefault("file_changes", []).append(fc)
+        messages = []
+        for task, result in zip(batch, results):
+            # Update task
+            if result.get("success"):
+                task.complete(result.get("output", "Completed"))
+            else:
+                task.fail(result.get("error", "Unknown error"))
+            
+            # Track tool calls and file changes
+            state.setdefault("tool_calls", deque(maxlen=MAX_TRACKED_TOOL_CALLS)).extend(
+                result.get("tool_calls", [])
+            )
+            state.setdefault("file_changes", []).extend(result.get("file_changes", []))
+            
+            status = "✓" if result.get("success") else "✗"
+            messages.append(
+                AIMessage(content=f"{status} Task: {task.title}\n{result.get('output', '')[:500]}")
+            )
         
         # Update iteration
         state["iteration"] = state.get("iteration", 0) + 1
         
-        # Add message
-        status = "✓" if result.get("success") else "✗"
-        state["messages"] = state.get("messages", []) + [
-            AIMessage(content=f"{status} Task: {current.title}\n{result.get('output', '')[:500]}")
-        ]
+        # Add messages (in place; the state dict is handed from node to node)
+        state.setdefault("messages", []).extend(messages)
         
         return state
     
@@ -175,12 +234,10 @@ def create_reviewer_node(config: FireConfig):
             return state
         
         # Create review summary
-        from aol_fire.llm import create_chat_model
         llm = create_chat_model(config, "fast")
         
         files_summary = ", ".join(set(fc.path for fc in file_changes[:10]))
         
-        from langchain_core.messages import HumanMessage
         response = llm.invoke([HumanMessage(
             content=f"Briefly review the changes made to: {files_summary}. Focus on any obvious issues."
         )])
@@ -352,14 +409,12 @@ def build_fire_graph(config: FireConfig) -> StateGraph:
 
 def create_initial_state(goal: str, config: FireConfig) -> WorkflowState:
     """Create the initial workflow state."""
-    from aol_fire.models import Memory
-    
     return {
         "goal": goal,
         "plan": None,
         "messages": [],
         "memory": Memory(),
-        "tool_calls": [],
+        "tool_calls": deque(maxlen=MAX_TRACKED_TOOL_CALLS),
         "file_changes": [],
         "iteration": 0,
         "max_iterations": config.max_iterations,
@@ -129,6 +129,21 @@ class TestPlan:
         plan.tasks[1].fail("Error")
         
         assert plan.success_rate == 50.0
+    
+    def test_plan_status_counts_track_changes(self):
+        plan = Plan(goal="Test")
+        plan.add_task("Task 1")
+        plan.add_task("Task 2")
+        assert plan.completed_count == 0
+        
+        plan.tasks[0].complete("Done")
+        plan.tasks[1].status = TaskStatus.FAILED
+        assert plan.completed_count == 1
+        assert plan.failed_count == 1
+        
+        plan.tasks = plan.tasks[:1]
+        assert plan.failed_count == 0
+        assert plan.is_complete
 
 
 class TestMemory:
@@ -159,6 +174,7 @@ class TestMemory:
         
         assert len(memory.conversation) == 2
         assert memory.conversation[0]["role"] == "user"
+        assert [m["content"] for m in memory.get_recent_conversation(1)] == ["Hi there"]
     
     def test_memory_search(self):
         memory = Memory()
@@ -168,6 +184,15 @@ class TestMemory:
         
         results = memory.search("Python")
         assert len(results) == 2
+    
+    def test_memory_search_by_type(self):
+        memory = Memory()
+        memory.add_entry("Python tip", type=MemoryType.SEMANTIC)
+        memory.add_entry("Ran Python tests")
+        memory.entries.append(MemoryEntry(type=MemoryType.SEMANTIC, content="Python style"))
+        
+        results = memory.search("python", type=MemoryType.SEMANTIC)
+        assert {e.content for e in results} == {"Python tip", "Python style"}
 
 
 class TestAgentState:
@@ -227,6 +252,24 @@ class TestConfig:
         assert config.llm_provider == "venice"
         assert config.max_iterations == 50
     
+    def test_build_config_reuses_instances(self, monkeypatch):
+        first = build_config(preset="groq", cli_args={"max_iterations": 7})
+        assert build_config(preset="groq", cli_args={"max_iterations": 7}) is first
+        
+        monkeypatch.setenv("FIRE_VERBOSE", "true")
+        changed = build_config(preset="groq", cli_args={"max_iterations": 7})
+        assert changed is not first
+        assert changed.verbose is True
+    
+    def test_to_json_bytes_omits_api_key(self):
+        import json
+        
+        config = FireConfig(api_key="secret-key", max_iterations=12)
+        data = config.to_json_bytes()
+        
+        assert b"secret-key" not in data
+        assert json.loads(data)["max_iterations"] == 12
+    
     def test_presets_exist(self):
         assert "openai" in FIRE_PRESETS
         assert "venice" in FIRE_PRESETS
@@ -276,6 +319,19 @@ class TestFileTools:
         assert (tmp_path / "output.txt").exists()
         assert (tmp_path / "output.txt").read_text() == "Test content"
     
+    def test_write_file_backup_keeps_old_content(self, tmp_path):
+        target = tmp_path / "output.txt"
+        target.write_text("old")
+        
+        tool = WriteFileTool(workspace_dir=tmp_path)
+        result = tool._run("output.txt", "new")
+        
+        backups = list(tmp_path.glob("output.*.bak"))
+        assert "Backup:" in result
+        assert len(backups) == 1
+        assert backups[0].read_text() == "old"
+        assert target.read_text() == "new"
+    
     def test_edit_file_tool(self, tmp_path):
         # Create initial file
         test_file = tmp_path / "test.txt"
@@ -310,9 +366,106 @@ class TestFileTools:
         
         assert "main.py" in result
         assert "hello" in result
+    
+    def test_search_files_skips_ignored_paths(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+        (tmp_path / "keep.py").write_text("needle = 1")
+        (tmp_path / "debug.log").write_text("needle")
+        for skipped in ("build", "node_modules", ".git"):
+            (tmp_path / skipped).mkdir()
+            (tmp_path / skipped / "x.py").write_text("needle = 2")
+        # A deeper .gitignore can re-include what a parent one ignores
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / ".gitignore").write_text("!x.log\n")
+        (tmp_path / "sub" / "x.log").write_text("needle")
+        (tmp_path / "sub" / "y.log").write_text("needle")
+        
+        tool = SearchFilesTool(workspace_dir=tmp_path)
+        result = tool._run("needle", ".")
+        
+        assert "Found 2 match" in result
+        assert "keep.py" in result
+        assert "x.log" in result
+        assert "y.log" not in result
+    
+    def test_search_files_stops_at_max_results(self, tmp_path):
+        for i in range(50):
+            (tmp_path / f"f{i:02d}.txt").write_text("needle\n")
+        
+        tool = SearchFilesTool(workspace_dir=tmp_path)
+        result = tool._run("needle", ".", max_results=3)
+        
+        assert result.count("📄") == 3
+        assert result.endswith("... truncated at 3 results")
+    
+    def test_search_files_literal_prefix_is_case_insensitive(self, tmp_path):
+        (tmp_path / "notes.txt").write_text("first\n# TODO: one\nmiddle\nTodo two\n")
+        
+        tool = SearchFilesTool(workspace_dir=tmp_path)
+        result = tool._run(r"todo\b", ".", context_lines=0)
+        
+        assert "Found 2 match" in result
+        assert ">    2 | # TODO: one" in result
+        assert ">    4 | Todo two" in result
+
+
+from aol_fire.tools.shell_tools import ExecuteCommandTool
+
+
+class TestShellTools:
+    """Test shell tools."""
+    
+    def test_blocklist_matches_case_insensitively(self, tmp_path):
+        tool = ExecuteCommandTool(workspace_dir=tmp_path, blocked_commands=["Sudo "])
+        
+        assert tool._is_blocked("SUDO apt install x") == "Sudo "
+        assert tool._is_blocked("rm -rf /*") == "rm -rf /*"
+        assert tool._is_blocked("ls -la") is None
+        assert "blocked" in tool._run("sudo reboot")
 
 
 # Workflow tests
+from aol_fire.tools.code_tools import AnalyzeCodeTool
+
+
+class TestCodeTools:
+    """Test code analysis."""
+    
+    def test_analyze_python_metrics_and_issues(self, tmp_path):
+        (tmp_path / "mod.py").write_text(
+            "# header\n"
+            "\n"
+            "def outer(x=[]):\n"
+            "    def inner(y):\n"
+            "        if y and x:\n"
+            "            return 1\n"
+            "    try:\n"
+            "        pass\n"
+            "    except:\n"
+            "        pass\n"
+        )
+        analysis = AnalyzeCodeTool(workspace_dir=tmp_path)._analyze_python(tmp_path / "mod.py")
+        
+        complexity = {f["name"]: f["complexity"] for f in analysis["functions"]}
+        # inner: 1 + if + and; outer: 1 + except (inner is scored separately)
+        assert complexity == {"inner": 3, "outer": 2}
+        assert [i["type"] for i in analysis["issues"]] == ["mutable_default", "bare_except"]
+        metrics = analysis["metrics"]
+        assert (metrics["total_lines"], metrics["code_lines"], metrics["comment_lines"],
+                metrics["blank_lines"]) == (10, 8, 1, 1)
+    
+    def test_analysis_cached_until_file_changes(self, tmp_path):
+        path = tmp_path / "mod.py"
+        path.write_text("def f():\n    pass\n")
+        tool = AnalyzeCodeTool(workspace_dir=tmp_path)
+        
+        first = tool._analyze_files([path])[path]
+        assert tool._analyze_files([path])[path] is first
+        
+        path.write_text("def f():\n    if x:\n        pass\n")
+        assert tool._analyze_files([path])[path]["functions"][0]["complexity"] == 2
+
+
 from aol_fire.workflow import create_initial_state, should_continue
 
 
@@ -336,6 +489,467 @@ class TestWorkflow:
         state = {"error": None, "iteration": 100, "max_iterations": 100, "plan": None}
         result = should_continue(state)
         assert result == "reporter"
+    
+    def test_stream_batches_flush_without_waiting_for_next_event(self, tmp_path):
+        import time
+        from aol_fire.core import FireAgent
+        
+        def slow_events(state):
+            yield "planner"
+            time.sleep(0.5)
+            yield "executor"
+            yield "reporter"
+        
+        agent = FireAgent(FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire"))
+        graph = MagicMock()
+        graph.stream.side_effect = slow_events
+        
+        with patch.object(agent, "_get_graph", return_value=graph):
+            start = time.monotonic()
+            batches = agent.stream("goal", batch_ms=50)
+            first = next(batches)
+            first_at = time.monotonic() - start
+            rest = list(batches)
+        
+        assert first == ["planner"]
+        assert first_at < 0.4
+        assert rest == [["executor", "reporter"]]
+    
+    def test_executor_keeps_separate_agents_per_run(self):
+        from aol_fire import workflow
+        
+        with patch.object(workflow, "OrchestratorAgent") as orchestrator_cls:
+            executor = workflow.create_executor_node(FireConfig(), [])
+            plan_a, plan_b = MagicMock(), MagicMock()
+            for plan in (plan_a, plan_a, plan_b):
+                executor({"plan": plan})
+        
+        # One orchestrator per run, reused across that run's iterations
+        assert orchestrator_cls.call_count == 2
+
+
+# Agent tests
+import json
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from aol_fire.agents.coder import CoderAgent
+from aol_fire.agents.orchestrator import OrchestratorAgent
+
+
+def as_stream(message: AIMessage):
+    """Split a message into the chunks FireChatModel.stream would yield."""
+    yield AIMessageChunk(content=message.content)
+    for i, tc in enumerate(message.tool_calls):
+        args = json.dumps(tc["args"])
+        yield AIMessageChunk(content="", tool_call_chunks=[
+            {"name": tc["name"], "args": args[:3], "id": tc["id"], "index": i},
+        ])
+        yield AIMessageChunk(content="", tool_call_chunks=[
+            {"name": None, "args": args[3:], "id": None, "index": i},
+        ])
+
+
+class TestCoderAgent:
+    """Test coder agent tool dispatch."""
+    
+    def test_parallel_tool_calls_keep_order(self, tmp_path):
+        (tmp_path / "a.txt").write_text("alpha")
+        (tmp_path / "b.txt").write_text("beta")
+        
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [ReadFileTool(workspace_dir=tmp_path)])
+        
+        responses = [
+            AIMessage(content="", tool_calls=[
+                {"id": "call_a", "name": "read_file", "args": {"path": "a.txt"}},
+                {"id": "call_b", "name": "read_file", "args": {"path": "b.txt"}},
+            ]),
+            AIMessage(content="done"),
+        ]
+        seen = []
+        
+        def fake_stream(messages, **kwargs):
+            seen.append(list(messages))
+            return as_stream(responses[len(seen) - 1])
+        
+        with patch.object(type(coder.llm), "stream", side_effect=fake_stream):
+            result = coder.execute_task(Task(title="Read files"))
+        
+        assert result["success"]
+        assert [tc.result for tc in result["tool_calls"]] == ["alpha", "beta"]
+        tool_messages = [m for m in seen[-1] if isinstance(m, ToolMessage)]
+        assert [m.tool_call_id for m in tool_messages] == ["call_a", "call_b"]
+
+
+    
+    def test_batch_execute_tasks(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [])
+        tasks = [Task(title="Name the app"), Task(title="Pick a license")]
+        reply = AIMessage(content=(
+            f'[{{"task_id": "{tasks[0].id}", "output": "FireApp"}}, '
+            f'{{"task_id": "{tasks[1].id}", "output": "MIT"}}]'
+        ))
+        
+        with patch.object(type(coder.llm), "invoke", return_value=reply) as invoke:
+            results = coder.batch_execute_tasks(tasks)
+        
+        assert invoke.call_count == 1
+        assert [r["output"] for r in results] == ["FireApp", "MIT"]
+
+    
+    def test_prompt_prefix_is_stable(self, tmp_path):
+        config = FireConfig(
+            llm_provider="anthropic",
+            workspace_dir=tmp_path,
+            data_dir=tmp_path / ".fire",
+        )
+        coder = CoderAgent(config, [])
+        system = coder._prefix_messages[0]
+        
+        assert system.content[0]["cache_control"] == {"type": "ephemeral"}
+        
+        first = coder.build_task_prompt(Task(title="One"), {"files": {"b.py": "b", "a.py": "a"}})
+        second = coder.build_task_prompt(Task(title="Two"), {"files": {"a.py": "a", "b.py": "b"}})
+        common = first.index("Task: One")
+        assert first[:common] == second[:common]
+
+    
+    def test_files_context_shares_budget(self, tmp_path):
+        from aol_fire.agents.coder import FILE_CONTEXT_TOKENS
+        
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [])
+        coder._encoding_loaded = True  # use the character approximation
+        
+        rendered = coder._build_files_context({"big.py": "x" * 50_000, "a.py": "short"})
+        
+        assert rendered.startswith("=== a.py ===\nshort\n\n=== big.py ===\n")
+        big = rendered.split("=== big.py ===\n")[1]
+        assert len(big) > FILE_CONTEXT_TOKENS * 4
+        assert len(big) <= 2 * FILE_CONTEXT_TOKENS * 4
+
+
+    def test_files_context_reused_when_unchanged(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [])
+        coder._encoding_loaded = True
+
+        with patch.object(coder, "_build_files_context", wraps=coder._build_files_context) as build:
+            coder.build_task_prompt(Task(title="One"), {"files": {"b.py": "b", "a.py": "a"}})
+            coder.build_task_prompt(Task(title="Two"), {"files": {"a.py": "a", "b.py": "b"}})
+            assert build.call_count == 1
+
+            coder.build_task_prompt(Task(title="Three"), {"files": {"a.py": "changed"}})
+            assert build.call_count == 2
+
+
+    def test_generate_code_extracts_fenced_block(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [])
+        reply = AIMessage(content="Here you go:\n```py\nprint('hi')\n```\nEnjoy")
+        
+        with patch.object(type(coder.llm), "invoke", return_value=reply):
+            assert coder.generate_code("say hi") == "print('hi')"
+
+    
+    def test_compact_tool_results(self, tmp_path):
+        config = FireConfig(llm_provider="ollama", workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [])
+        call = lambda i: AIMessage(content="", tool_calls=[{"id": i, "name": "read_file", "args": {}}])
+        messages = [
+            call("old"), ToolMessage(content="x" * 10_000, tool_call_id="old"),
+            call("new"), ToolMessage(content="y" * 10_000, tool_call_id="new"),
+        ]
+        
+        coder._compact_tool_results(messages)
+        
+        assert messages[1].content.endswith("[truncated earlier tool result]")
+        assert messages[3].content == "y" * 10_000
+    
+    def test_clip_marks_truncated_bytes(self):
+        from aol_fire.agents.coder import _clip
+        
+        assert _clip(b"short", 10) == "short"
+        assert _clip(b"x" * 100, 10) == "x" * 10 + "\n[truncated 90 chars]"
+        assert _clip("\u00e9".encode() * 100, 10) == "\u00e9" * 10 + "\n[truncated 90 chars]"
+
+
+
+class TestParsing:
+    """Test LLM response parsing helpers."""
+    
+    def test_extract_first_json_ignores_braces_in_strings(self):
+        from aol_fire.agents.parsing import extract_first_json
+        
+        text = 'Plan:\n{"description": "use { and }", "n": {"x": 1}}\nAlso {"other": 2}'
+        assert extract_first_json(text) == '{"description": "use { and }", "n": {"x": 1}}'
+        assert extract_first_json('["a", ["b"]] trailing ]', "[") == '["a", ["b"]]'
+        assert extract_first_json("no json here") is None
+    
+    def test_parse_json_response_modes(self):
+        from aol_fire.agents.parsing import parse_json_response
+        
+        assert parse_json_response('{"a": 1}', json_mode=True) == {"a": 1}
+        assert parse_json_response('Sure: {"a": 1} done', json_mode=True) == {"a": 1}
+        assert parse_json_response('Sure: {"a": 1} done') == {"a": 1}
+        assert parse_json_response("nothing") is None
+        
+        # A JSON-mode reply that isn't an object falls back to a default plan
+        from aol_fire.agents.planner import PlannerAgent
+        
+        planner = PlannerAgent(FireConfig(llm_json_mode=True))
+        plan = planner._parse_plan_response("goal", '[{"title": "a"}]')
+        assert [t.title for t in plan.tasks] == ["Execute goal"]
+
+
+class TestOrchestratorAgent:
+    """Test orchestrator coordination helpers."""
+    
+    def test_prefetched_prompt_reused_and_invalidated(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        coder = CoderAgent(config, [])
+        orchestrator = OrchestratorAgent(config)
+        task = Task(title="Write module", description="Create app.py")
+        
+        orchestrator.prefetch_task_prompt(coder, task)
+        assert orchestrator.take_prefetched_prompt(task) == coder.build_task_prompt(task)
+        
+        orchestrator.prefetch_task_prompt(coder, task)
+        task.title = "Renamed by refinement"
+        assert orchestrator.take_prefetched_prompt(task) is None
+    
+    def test_select_agent_for_task(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        orchestrator = OrchestratorAgent(config)
+        
+        assert orchestrator.select_agent_for_task(Task(title="t", tags=["code", "fix"])) == AgentRole.DEBUGGER
+        assert orchestrator.select_agent_for_task(Task(title="t", tags=["deploy"])) == AgentRole.DEVOPS
+        assert orchestrator.select_agent_for_task(Task(title="t", tags=["docs"])) == AgentRole.CODER
+    
+    def test_analyze_goal_is_memoized(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        orchestrator = OrchestratorAgent(config)
+        reply = AIMessage(content='{"complexity": "simple", "agents_needed": ["coder"]}')
+        
+        with patch.object(type(orchestrator.llm), "invoke", return_value=reply) as invoke:
+            first = orchestrator.analyze_goal("Build a CLI")
+            first["complexity"] = "mutated"
+            second = orchestrator.analyze_goal("Build a CLI")
+        
+        assert invoke.call_count == 1
+        assert second["complexity"] == "simple"
+    
+    def test_next_task_batch(self, tmp_path):
+        config = FireConfig(workspace_dir=tmp_path, data_dir=tmp_path / ".fire")
+        orchestrator = OrchestratorAgent(config)
+        plan = Plan(goal="Test")
+        first = plan.add_task("Name it", tags=["simple"])
+        plan.add_task("Describe it", tags=["simple"])
+        plan.add_task("Depends on first", tags=["simple"], dependencies=[first.id])
+        plan.add_task("Write code", tags=["code"])
+        
+        assert [t.title for t in orchestrator.next_task_batch(plan)] == ["Name it", "Describe it"]
+
+
+# LLM tests
+from aol_fire.llm import FireChatModel, response_cache
+
+
+def completion(content: str) -> MagicMock:
+    """A fake httpx response carrying a chat completion."""
+    response = MagicMock()
+    response.content = json.dumps({
+        "choices": [{"message": {"content": content}, "finish_reason": "stop"}],
+        "model": "test-model",
+    }).encode()
+    return response
+
+
+class TestFireChatModel:
+    """Test the chat model's request handling."""
+    
+    def test_deterministic_responses_are_cached(self):
+        response_cache.clear()
+        client = MagicMock()
+        client.post.return_value = completion("hello")
+        
+        with patch("aol_fire.llm._get_client", return_value=client):
+            model = FireChatModel(temperature=0)
+            assert model.invoke("hi").content == "hello"
+            assert model.invoke("hi").content == "hello"
+            assert client.post.call_count == 1
+            
+            warm = FireChatModel(temperature=0.7)
+            warm.invoke("hi")
+            warm.invoke("hi")
+            assert client.post.call_count == 3
+        
+        assert FireChatModel.cache_stats()["hits"] == 1
+    
+    def test_fuzzy_cache_matches_rephrased_prompts(self):
+        response_cache.clear()
+        client = MagicMock()
+        client.post.return_value = completion("done")
+        
+        with patch("aol_fire.llm._get_client", return_value=client):
+            model = FireChatModel(temperature=0, fuzzy_cache=True)
+            model.invoke("Add a README  file to the project")
+            model.invoke("add a readme file to the project!")
+            assert client.post.call_count == 1
+            
+            model.invoke("Delete the project")
+            assert client.post.call_count == 2
+    
+    def test_convert_messages_reuses_appended_history(self):
+        from langchain_core.messages import HumanMessage
+        
+        model = FireChatModel()
+        history = [HumanMessage(content="one"), AIMessage(content="two")]
+        history[1].additional_kwargs["cache_control"] = {"type": "ephemeral"}
+        first = model._convert_messages(history)
+        assert first[1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        
+        history[1].additional_kwargs.pop("cache_control")
+        history.append(HumanMessage(content="three"))
+        second = model._convert_messages(history)
+        assert second[0] is first[0]
+        assert second[1] == {"role": "assistant", "content": "two"}
+        assert second[2] == {"role": "user", "content": "three"}
+        
+        history[0] = HumanMessage(content="changed")
+        assert model._convert_messages(history)[0]["content"] == "changed"
+    
+    def test_stream_parses_split_sse_events(self):
+        events = (
+            b'data: {"choices": [{"delta": {"content": "Hel"}}]}\r\n\r\n'
+            b'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+            b'data: [DONE]\n\n'
+        )
+        response = MagicMock()
+        response.iter_bytes.return_value = [events[i:i + 7] for i in range(0, len(events), 7)]
+        client = MagicMock()
+        client.stream.return_value.__enter__.return_value = response
+        
+        with patch("aol_fire.llm._get_client", return_value=client):
+            chunks = list(FireChatModel().stream("hi"))
+        
+        assert "".join(c.content for c in chunks) == "Hello"
+    
+    def test_stream_forwards_tool_call_fragments(self):
+        deltas = [
+            {"tool_calls": [{"index": 0, "id": "call_1", "function": {"name": "write_file", "arguments": ""}}]},
+            {"tool_calls": [{"index": 0, "function": {"arguments": '{"path": "a.py", '}}]},
+            {"tool_calls": [{"index": 0, "function": {"arguments": '"content": "x = 1"}'}}]},
+        ]
+        events = b"".join(
+            b"data: " + json.dumps({"choices": [{"delta": d}]}).encode() + b"\n\n" for d in deltas
+        ) + b"data: [DONE]\n\n"
+        response = MagicMock()
+        response.iter_bytes.return_value = [events]
+        client = MagicMock()
+        client.stream.return_value.__enter__.return_value = response
+        
+        with patch("aol_fire.llm._get_client", return_value=client):
+            chunks = list(FireChatModel().stream("hi"))
+        
+        # Partial arguments are already parsed after the second fragment
+        assert (chunks[0] + chunks[1]).tool_calls[0]["args"] == {"path": "a.py"}
+        merged = chunks[0]
+        for chunk in chunks[1:]:
+            merged += chunk
+        assert merged.tool_calls[0]["args"] == {"path": "a.py", "content": "x = 1"}
+    
+    def test_retries_honor_retry_after_and_skip_client_errors(self):
+        import httpx
+        
+        def status_error(code: int, headers=None) -> MagicMock:
+            request = httpx.Request("POST", "http://test/chat/completions")
+            response = httpx.Response(code, headers=headers or {}, request=request)
+            failed = MagicMock()
+            failed.raise_for_status.side_effect = httpx.HTTPStatusError(
+                "error", request=request, response=response
+            )
+            return failed
+        
+        client = MagicMock()
+        model = FireChatModel(temperature=0.5, retry_delay=10.0)
+        
+        with patch("aol_fire.llm._get_client", return_value=client), \
+                patch("aol_fire.llm.time.sleep") as sleep:
+            client.post.side_effect = [status_error(503, {"Retry-After": "2"}), completion("ok")]
+            assert model.invoke("hi").content == "ok"
+            sleep.assert_called_once_with(2.0)
+            
+            client.post.side_effect = [status_error(400), completion("never")]
+            with pytest.raises(ValueError, match="400"):
+                model.invoke("hi")
+            assert sleep.call_count == 1
+    
+    def test_stream_retries_before_first_chunk(self):
+        import httpx
+        
+        events = b'data: {"choices": [{"delta": {"content": "ok"}}]}\n\ndata: [DONE]\n\n'
+        replies = [
+            httpx.Response(429, headers={"Retry-After": "1"}, content=b"slow down"),
+            httpx.Response(200, content=events),
+        ]
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: replies.pop(0)))
+        
+        with patch("aol_fire.llm._get_client", return_value=client), \
+                patch("aol_fire.llm.time.sleep") as sleep:
+            chunks = list(FireChatModel().stream("hi"))
+        
+        assert "".join(c.content for c in chunks) == "ok"
+        sleep.assert_called_once_with(1.0)
+    
+    def test_token_bucket_waits_when_empty(self):
+        import asyncio
+        import time
+        from aol_fire.llm import TokenBucket
+        
+        async def take(bucket: TokenBucket, n: int) -> float:
+            start = time.monotonic()
+            for _ in range(n):
+                await bucket.acquire()
+            return time.monotonic() - start
+        
+        assert asyncio.run(take(TokenBucket(rate=50), 50)) < 0.05
+        assert asyncio.run(take(TokenBucket(rate=50, capacity=1), 3)) >= 0.03
+    
+    def test_rate_limiters_keep_separate_buckets_per_rate(self):
+        from aol_fire.llm import _get_rate_limiter
+        
+        slow = _get_rate_limiter("http://shared", 1.0)
+        fast = _get_rate_limiter("http://shared", 5.0)
+        
+        assert slow is not fast
+        assert _get_rate_limiter("http://shared", 1.0) is slow
+        assert _get_rate_limiter("http://shared", 0) is None
+    
+    def test_semaphores_keep_separate_limits_per_endpoint(self):
+        import asyncio
+        from aol_fire.llm import _get_semaphore
+        
+        async def check():
+            narrow = _get_semaphore("http://shared", 2)
+            wide = _get_semaphore("http://shared", 8)
+            assert narrow is not wide
+            assert _get_semaphore("http://shared", 2) is narrow
+        
+        asyncio.run(check())
+    
+    def test_aclose_clients_closes_the_loops_clients(self):
+        import asyncio
+        from aol_fire.llm import _get_async_client, aclose_clients
+        
+        async def check():
+            client = _get_async_client("http://shared", 30)
+            await aclose_clients()
+            assert client.is_closed
+            assert _get_async_client("http://shared", 30) is not client
+            await aclose_clients()
+        
+        asyncio.run(check())
 
 
 # Run tests